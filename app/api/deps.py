@@ -1,18 +1,23 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.security import decode_access_token
-from app.database.db import get_db
+from app.database.db import get_async_db
 from app.database.models.user import User
 from app.services.storage import StorageService
+from app.services.async_storage import AsyncStorageService
+from app.services.events import JobEventHub
+from app.services.user_cache import user_cache
+from app.services.password_pool import PasswordHashingPool
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
     try:
         token_payload = decode_access_token(token)
@@ -23,9 +28,11 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.exec(
-        select(User).where(User.username == token_payload.sub)
-    ).first()
+    async def load_user(username: str) -> User | None:
+        result = await db.exec(select(User).where(User.username == username))
+        return result.first()
+
+    user = await user_cache.aget_user(token_payload.sub, load_user)
 
     if not user:
         raise HTTPException(
@@ -36,4 +43,13 @@ def get_current_user(
     return user
 
 def get_storage_service(request: Request) -> StorageService:
-    return request.app.state.storage_service
\ No newline at end of file
+    return request.app.state.storage_service
+
+def get_async_storage_service(request: Request) -> AsyncStorageService:
+    return request.app.state.async_storage_service
+
+def get_job_event_hub(request: Request) -> JobEventHub:
+    return request.app.state.job_event_hub
+
+def get_password_pool(request: Request) -> PasswordHashingPool:
+    return request.app.state.password_pool
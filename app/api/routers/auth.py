@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.api.deps import get_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.deps import get_async_db
 from app.schemas.auth import Token, LoginUser, RegisterUser, UserRead
 from app.services.auth import AuthService
 from app.domain.exceptions import (
     UsernameAlreadyExistsException,
     UserNotFoundException,
     InvalidCredentialsException,
+    PasswordHashingBusyException,
 )
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_password_pool
+from app.services.password_pool import PasswordHashingPool
 from jwt import PyJWTError
 from app.core.security import decode_access_token
 from app.database.models.user import User
@@ -16,28 +18,41 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+HASHING_BUSY_RETRY_AFTER_SECONDS = 1
+
+def hashing_busy_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many authentication requests, try again shortly",
+        headers={"Retry-After": str(HASHING_BUSY_RETRY_AFTER_SECONDS)},
+    )
+
 @router.post("/register", response_model=UserRead)
-def register(
+async def register(
     payload: RegisterUser,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    hashing_pool: PasswordHashingPool = Depends(get_password_pool),
 ):
-    auth_service = AuthService(db)
+    auth_service = AuthService(db, hashing_pool)
     try:
-        return auth_service.register(payload.username, payload.password)
+        return await auth_service.register(payload.username, payload.password)
     except UsernameAlreadyExistsException:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already exists",
         )
+    except PasswordHashingBusyException:
+        raise hashing_busy_error()
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    hashing_pool: PasswordHashingPool = Depends(get_password_pool),
 ):
-    auth_service = AuthService(db)
+    auth_service = AuthService(db, hashing_pool)
     try:
-        access_token = auth_service.login(form_data.username, form_data.password)
+        access_token = await auth_service.login(form_data.username, form_data.password)
         return {"access_token": access_token, "token_type": "bearer"}
     except (UserNotFoundException, InvalidCredentialsException):
         raise HTTPException(
@@ -45,7 +60,9 @@ def login(
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except PasswordHashingBusyException:
+        raise hashing_busy_error()
 
 @router.get("/me", response_model=UserRead)
-def read_current_user(current_user: User = Depends(get_current_user)):
+async def read_current_user(current_user: User = Depends(get_current_user)):
     return current_user
\ No newline at end of file
@@ -1,12 +1,37 @@
-from fastapi import APIRouter, Depends, UploadFile, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, UploadFile, HTTPException, Request, Response, Query, Form, status
+from fastapi.responses import StreamingResponse, RedirectResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
-from app.api.deps import get_db, get_current_user, get_storage_service
-from app.services.media import MediaService
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.deps import (
+    get_async_db,
+    get_current_user,
+    get_storage_service,
+    get_async_storage_service,
+    get_job_event_hub,
+)
+from app.core.config import settings
+from app.database.db import get_db
+from app.services.media import MediaService, AsyncMediaService, JOB_LIST_FIELDS
 from app.services.storage import StorageService
+from app.services.async_storage import AsyncStorageService
+from app.services.events import JobEventHub
+from app.services.renditions import job_output
 from app.database.models.user import User
-from app.schemas.conversion_jobs import ConversionJobRead
+from app.database.models.conversion_jobs import JobStatus
+from app.schemas.conversion_jobs import (
+    ConversionJobRead,
+    UploadCreate,
+    PresignedUploadRead,
+    ConversionJobPage,
+    JobStatusBatchRequest,
+    JobStatusBatchRead,
+    OutputProfiles,
+)
+from pydantic import TypeAdapter, ValidationError
 from uuid import UUID
+import asyncio
+import json
 from app.domain.exceptions import (
     ConversionJobNotFoundException,
     JobNotCompletedException,
@@ -15,27 +40,54 @@ from app.domain.exceptions import (
     StorageUnavailableError,
     StorageError,
     ConversionFailedException,
+    MediaTooLargeException,
+    InvalidCursorException,
+    RenditionNotFoundException,
 )
 
 router = APIRouter(prefix="/media", tags=["uploads"])
 
+SSE_KEEPALIVE_SECONDS = 15
+TERMINAL_STATUSES = {JobStatus.DONE.value, JobStatus.FAILED.value}
+
+output_profiles_adapter = TypeAdapter(OutputProfiles)
+
 @router.post("/upload", response_model=ConversionJobRead)
-def upload_video(
+async def upload_video(
     file: UploadFile,
+    profiles: str | None = Form(None, description="JSON list of output profiles"),
     db: Session = Depends(get_db),
-    storage: StorageService = Depends(get_storage_service),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
     current_user: User = Depends(get_current_user),
 ):
-    service = MediaService(db=db, storage=storage)
+    service = MediaService(db=db, storage=async_storage.storage)
+
+    output_profiles = None
+    if profiles:
+        try:
+            output_profiles = output_profiles_adapter.validate_json(profiles)
+        except ValidationError as e:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_CONTENT,
+                e.errors(include_url=False, include_context=False),
+            )
 
     try:
-        return service.upload_video(
+        # The whole upload (DB row, storage PUT, enqueue) blocks, so it runs
+        # on the bounded storage threads rather than the default threadpool
+        return await async_storage.run(
+            service.upload_video,
             user_id=current_user.id,
             file=file.file,
             filename=file.filename,
             content_type=file.content_type,
+            size=file.size,
+            profiles=output_profiles,
         )
-    
+
+    except MediaTooLargeException as e:
+        raise HTTPException(status.HTTP_413_CONTENT_TOO_LARGE, str(e))
+
     except ConversionFailedException as e:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
 
@@ -49,17 +101,156 @@ def upload_video(
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to upload video")
 
 
-@router.get("/{id}/status")
-def get_upload_status(
+@router.get("/jobs", response_model=ConversionJobPage)
+async def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    job_status: JobStatus | None = Query(None, alias="status"),
+    fields: str | None = Query(None, description="Comma-separated job fields to return"),
+    db: AsyncSession = Depends(get_async_db),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The user's jobs, newest first. Pass next_cursor back as cursor to get the
+    following page.
+    """
+    selected = None
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(selected) - set(JOB_LIST_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+
+    service = AsyncMediaService(db=db, storage=async_storage)
+
+    try:
+        items, next_cursor = await service.list_jobs(
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            status=job_status,
+            fields=selected,
+        )
+    except InvalidCursorException:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+    return ConversionJobPage(items=items, next_cursor=next_cursor)
+
+
+@router.post("/status:batch", response_model=JobStatusBatchRead)
+async def get_upload_statuses(
+    payload: JobStatusBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Statuses of several jobs at once. Send as_of back as since on the next
+    poll to only get the jobs that changed in between.
+    """
+    service = AsyncMediaService(db=db, storage=async_storage)
+
+    jobs, as_of = await service.get_statuses(
+        job_ids=payload.ids,
+        user_id=current_user.id,
+        since=payload.since,
+    )
+
+    return JobStatusBatchRead(
+        jobs={job.id: ConversionJobRead.model_validate(job) for job in jobs},
+        as_of=as_of,
+    )
+
+
+@router.post("/uploads", response_model=PresignedUploadRead)
+async def create_upload(
+    payload: UploadCreate,
+    db: Session = Depends(get_db),
+    storage: StorageService = Depends(get_storage_service),
+    current_user: User = Depends(get_current_user),
+):
+    if not storage.supports_presigned_urls:
+        raise HTTPException(
+            status.HTTP_501_NOT_IMPLEMENTED,
+            "Direct uploads are not available with this storage backend, use POST /media/upload",
+        )
+
+    service = MediaService(db=db, storage=storage)
+
+    try:
+        job, upload_url, expires_at = await run_in_threadpool(
+            service.create_upload,
+            user_id=current_user.id,
+            filename=payload.filename,
+            content_type=payload.content_type,
+            profiles=payload.profiles,
+        )
+        return PresignedUploadRead(
+            job=ConversionJobRead.model_validate(job),
+            upload_url=upload_url,
+            expires_at=expires_at,
+        )
+
+    except ConversionFailedException as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    except StorageError:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to create upload")
+
+
+@router.post("/{id}/complete", response_model=ConversionJobRead)
+async def complete_upload(
     id: UUID,
     db: Session = Depends(get_db),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
     current_user: User = Depends(get_current_user),
-    storage: StorageService = Depends(get_storage_service),
+):
+    service = MediaService(db=db, storage=async_storage.storage)
+
+    try:
+        # Stats the uploaded object, so it runs on the storage threads
+        return await async_storage.run(
+            service.complete_upload,
+            job_id=id,
+            user_id=current_user.id,
+        )
+    except ConversionJobNotFoundException:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job not found")
+
+    except ObjectNotFoundError:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Video has not been uploaded")
+
+    except MediaTooLargeException as e:
+        raise HTTPException(status.HTTP_413_CONTENT_TOO_LARGE, str(e))
+
+    except ConversionFailedException as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    except StoragePermissionError:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Storage access denied")
+
+    except StorageUnavailableError:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Storage temporarily unavailable")
+
+    except StorageError:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Storage error")
+
+
+@router.get("/{id}/status")
+async def get_upload_status(
+    id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
 ) -> ConversionJobRead:
-    service = MediaService(db=db, storage=storage)
+    service = AsyncMediaService(db=db, storage=async_storage)
 
     try:
-        job = service.get_status(
+        job = await service.get_status(
             job_id=id,
             user_id=current_user.id,
         )
@@ -70,26 +261,137 @@ def get_upload_status(
             detail="Job not found"
         )
 
+@router.get("/{id}/events")
+async def stream_job_events(
+    id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
+    hub: JobEventHub = Depends(get_job_event_hub),
+):
+    """
+    Server-Sent Events stream of a job's status. Sends the current state
+    first, then every transition, and closes once the job is DONE or FAILED.
+    """
+    service = AsyncMediaService(db=db, storage=async_storage)
+
+    # Subscribe before reading the row so no transition falls in between
+    events = hub.subscribe(str(id))
+    try:
+        job = await service.get_status(id, current_user.id)
+    except ConversionJobNotFoundException:
+        hub.unsubscribe(str(id), events)
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job not found")
+
+    # Hand the connection back to the pool before the long-lived stream starts
+    await db.close()
+
+    current = ConversionJobRead.model_validate(job).model_dump(mode="json")
+
+    async def event_stream():
+        try:
+            event = current
+            while True:
+                yield f"event: status\ndata: {json.dumps(event)}\n\n"
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+
+                while True:
+                    try:
+                        event = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            return
+                        yield ": keepalive\n\n"
+        finally:
+            hub.unsubscribe(str(id), events)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{id}/download")
-def download_mp3(
+async def download_mp3(
     id: UUID,
-    db: Session = Depends(get_db),
-    storage: StorageService = Depends(get_storage_service),
+    request: Request,
+    redirect: bool | None = None,
+    rendition: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
     current_user: User = Depends(get_current_user),
 ):
-    service = MediaService(db=db, storage=storage)
+    service = AsyncMediaService(db=db, storage=async_storage)
+
+    if redirect is None:
+        redirect = settings.DOWNLOAD_REDIRECT
+    # Backends without presigned URLs are always proxied
+    redirect = redirect and async_storage.storage.supports_presigned_urls
 
     try:
-        mp3_stream = service.download_mp3(
-            job_id=id,
-            user_id=current_user.id,
+        if redirect:
+            url = await service.get_mp3_url(id, current_user.id, rendition)
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+        job = await service.get_finished_job(id, current_user.id)
+        await db.close()
+        output_key, content_type, extension = job_output(job, rendition)
+        stat = await async_storage.stat_file(output_key)
+        etag = f'"{stat.etag}"'
+        headers = {
+            "Content-Disposition": f'attachment; filename="{id}.{extension}"',
+            "Accept-Ranges": "bytes",
+            "ETag": etag,
+        }
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        # Files on a local volume are sent by Starlette, which handles
+        # Range/If-Range itself and uses the server's pathsend (sendfile)
+        # when it has one
+        local_path = async_storage.storage.local_path(output_key)
+        if local_path:
+            return FileResponse(local_path, media_type=content_type, headers=headers)
+
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if if_range is None or if_range == etag:
+            try:
+                byte_range = parse_range(request.headers.get("range"), stat.size)
+            except ValueError:
+                raise HTTPException(
+                    status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    "Requested range not satisfiable",
+                    headers={"Content-Range": f"bytes */{stat.size}"},
+                )
+
+        if byte_range is None:
+            mp3_stream = await async_storage.download_file(output_key)
+            return StreamingResponse(
+                async_storage.iter_file(mp3_stream),
+                media_type=content_type,
+                headers={**headers, "Content-Length": str(stat.size)},
+            )
+
+        start, end = byte_range
+        mp3_stream = await async_storage.download_file(
+            output_key,
+            offset=start,
+            length=end - start + 1,
         )
         return StreamingResponse(
-            iter_file(mp3_stream),
-            media_type="audio/mpeg",
+            async_storage.iter_file(mp3_stream),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=content_type,
             headers={
-                "Content-Disposition": f'attachment; filename="{id}.mp3"',
-                "Accept-Ranges": "bytes",
+                **headers,
+                "Content-Range": f"bytes {start}-{end}/{stat.size}",
+                "Content-Length": str(end - start + 1),
             },
         )
     except ConversionJobNotFoundException:
@@ -97,6 +399,9 @@ def download_mp3(
     
     except JobNotCompletedException:
         raise HTTPException(status.HTTP_409_CONFLICT, "Job is not finished yet")
+
+    except RenditionNotFoundException:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Rendition not found")
     
     except ObjectNotFoundError:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "MP3 not found")
@@ -111,9 +416,71 @@ def download_mp3(
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Storage error")
 
 
-def iter_file(obj):
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_job(
+    id: UUID,
+    db: Session = Depends(get_db),
+    async_storage: AsyncStorageService = Depends(get_async_storage_service),
+    current_user: User = Depends(get_current_user),
+):
+    service = MediaService(db=db, storage=async_storage.storage)
+
     try:
-        yield from obj.stream(32 * 1024)
-    finally:
-        obj.close()
-        obj.release_conn()
\ No newline at end of file
+        await async_storage.run(
+            service.delete_job,
+            job_id=id,
+            user_id=current_user.id,
+        )
+    except ConversionJobNotFoundException:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job not found")
+
+    except JobNotCompletedException:
+        raise HTTPException(status.HTTP_409_CONFLICT, "Job is not finished yet")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parses a single "bytes=start-end" range into inclusive offsets.
+
+    Returns None when the whole file should be sent (no header, malformed
+    header such as a last position before the first, or multiple ranges)
+    and raises ValueError when the range is unsatisfiable: it starts past
+    the end of the file or is an empty suffix.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+
+    first, sep, last = spec.partition("-")
+    if not sep or not (first + last).isdigit():
+        return None
+
+    if first == "":
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        # Invalid rather than unsatisfiable, RFC 9110 says to ignore it
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    end = min(int(last), size - 1) if last else size - 1
+
+    return start, end
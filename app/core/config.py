@@ -10,21 +10,94 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DATABASE_ASYNC_URL: str | None = None # Defaults to DATABASE_URL with the asyncpg driver
+    DB_POOL_SIZE: int = 5 # Connections kept open per process
+    DB_MAX_OVERFLOW: int = 10 # Extra connections allowed under load
+    DB_POOL_TIMEOUT: int = 30 # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 30 * 60 # Reconnect connections older than this (seconds)
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0 # Postgres statement_timeout, 0 disables it
     
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
 
+    # Password hashing (Argon2id). Changing the costs rehashes passwords on next login.
+    PASSWORD_HASH_TIME_COST: int = 3
+    PASSWORD_HASH_MEMORY_COST: int = 64 * 1024 # KiB
+    PASSWORD_HASH_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2 # Processes dedicated to hashing
+    PASSWORD_HASH_MAX_PENDING: int = 32 # Queued + running hashes before answering 429
+
+    # Authenticated user cache
+    USER_CACHE_BACKEND: str = Field(default="memory", description="memory|redis")
+    USER_CACHE_TTL_SECONDS: int = 60
+    JOB_STATUS_POLL_OVERLAP_SECONDS: int = 5 # as_of of status polls lags the DB clock by this, covers worker clock skew and in-flight commits
+    USER_CACHE_MAX_SIZE: int = 10_000 # Entries per process, memory backend only
+    USER_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Object storage
+    STORAGE_BACKEND: str = Field(default="minio", description="minio|local")
+    STORAGE_LOCAL_ROOT: str = "data/media" # Objects directory of the local backend, shared by the API and workers
+
     # MinIO / S3 configurations
     STORAGE_ENDPOINT: str = "localhost:9000"
     STORAGE_ACCESS_KEY: str = "minioadmin"
     STORAGE_SECRET_KEY: str = "minioadmin"
     STORAGE_SECURE: bool = False # This controls whether to use HTTPS or HTTP
     STORAGE_BUCKET_NAME: str = "media"
+    STORAGE_REGION: str = "us-east-1"
+    STORAGE_PUBLIC_ENDPOINT: str | None = None # Host clients use for presigned URLs, defaults to STORAGE_ENDPOINT
+    STORAGE_PUBLIC_SECURE: bool = False
+    STORAGE_PRESIGNED_UPLOAD_EXPIRE_MINUTES: int = 60
+    STORAGE_IO_CONCURRENCY: int = 64 # Max threads the API uses for blocking storage calls
+    STORAGE_UPLOAD_CONCURRENCY: int = 4 # Parts uploaded in parallel per object
+    STORAGE_UPLOAD_PART_SIZE: int = 10 * 1024 * 1024 # Part size when the object length is unknown
+    STORAGE_UPLOAD_TARGET_PARTS: int = 64 # Part size is picked to split known-length objects into about this many parts
+    STORAGE_ABORT_INCOMPLETE_UPLOADS_DAYS: int = 1 # Lifecycle rule for orphaned multipart uploads, 0 disables it
+    STORAGE_PRESIGNED_DOWNLOAD_EXPIRE_MINUTES: int = 5
+    DOWNLOAD_REDIRECT: bool = False # Redirect MP3 downloads to a presigned URL instead of proxying them
+
+    # Metrics
+    WORKER_METRICS_PORT: int = 0 # Port of the celery worker's Prometheus exporter, 0 disables it
 
     # RabbitMQ
     RABBITMQ_URL: str
 
+    # Outbox relay
+    OUTBOX_BATCH_SIZE: int = 100 # Messages published per round trip
+    OUTBOX_POLL_INTERVAL: float = 0.5 # Seconds between polls when the outbox is empty
+    OUTBOX_RETENTION_HOURS: int = 24 # Sent messages are deleted after this
+
+    # Upload validation, before a job is queued
+    UPLOAD_PROBE_ENABLED: bool = True # ffprobe inputs on upload; without ffprobe on the API hosts they are queued unprobed
+    UPLOAD_MAX_BYTES: int = 2 * 1024 * 1024 * 1024 # 0 disables the limit
+    UPLOAD_MAX_DURATION_SECONDS: int = 4 * 60 * 60 # 0 disables the limit
+
+    # Conversion
+    CONVERSION_STREAMING_ENABLED: bool = True # Pipe storage -> ffmpeg -> storage when the container allows it
+    CONVERSION_SEGMENT_MIN_DURATION: int = 30 * 60 # Inputs at least this long (seconds) are encoded in parallel segments
+    CONVERSION_SEGMENT_COUNT: int = 4 # Number of segments, 1 disables segmented encoding
+    CONVERSION_PROGRESS_INTERVAL: float = 2.0 # Min seconds between progress writes per job
+    CONVERSION_MAX_RETRIES: int = 3 # Per job, only transient failures (storage, database, OOM) are retried
+    CONVERSION_RETRY_BACKOFF_SECONDS: int = 10 # Doubled on every retry, with jitter
+    CONVERSION_RETRY_BACKOFF_MAX_SECONDS: int = 10 * 60
+    CONVERSION_INPUT_CACHE_DIR: str | None = None # Downloaded inputs kept for retries, defaults to a directory in the system temp dir
+    CONVERSION_INPUT_CACHE_MAX_AGE_SECONDS: int = 6 * 60 * 60 # Left-over inputs (jobs retried elsewhere) are deleted after this
+    JOB_LEASE_SECONDS: int = 5 * 60 # A PROCESSING job whose worker stopped renewing this long is re-enqueued
+    REAPER_INTERVAL_SECONDS: int = 60
+    REAPER_PENDING_STALE_SECONDS: int = 15 * 60 # PENDING jobs untouched this long are re-enqueued
+    REAPER_BATCH_SIZE: int = 500 # Max jobs of each kind re-enqueued per run
+    REAPER_UPLOADING_GRACE_SECONDS: int = 60 * 60 # UPLOADING jobs are failed this long after their upload URL expired
+
+    # Conversion queues. Jobs at or under both SHORT limits go to convert.short,
+    # at or over either LONG limit to convert.long, the rest to convert.standard.
+    # Duration is only used when the input has been probed.
+    CONVERSION_QUEUE_SHORT_MAX_BYTES: int = 50 * 1024 * 1024
+    CONVERSION_QUEUE_SHORT_MAX_SECONDS: int = 5 * 60
+    CONVERSION_QUEUE_LONG_MIN_BYTES: int = 1024 * 1024 * 1024
+    CONVERSION_QUEUE_LONG_MIN_SECONDS: int = 60 * 60
+
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,152 @@
+import os
+from typing import Callable
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# With several processes (uvicorn --workers, celery prefork) every process
+# writes its samples to PROMETHEUS_MULTIPROC_DIR and a scrape aggregates them
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Storage and ffmpeg stages run from seconds to hours
+LONG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response started, per route",
+    ["method", "route", "status"],
+)
+
+STORAGE_OPERATION_DURATION = Histogram(
+    "storage_operation_duration_seconds",
+    "Object storage call latency; for downloads, until the body starts streaming",
+    ["operation"],
+    buckets=LONG_BUCKETS,
+)
+STORAGE_BYTES = Counter(
+    "storage_bytes_total",
+    "Bytes uploaded to / opened for download from object storage",
+    ["operation"],
+)
+STORAGE_ERRORS = Counter(
+    "storage_errors_total",
+    "Failed object storage calls",
+    ["operation", "error"],
+)
+
+CONVERSION_STAGE_DURATION = Histogram(
+    "conversion_stage_duration_seconds",
+    "Time spent in each stage of a conversion",
+    ["stage"],
+    buckets=LONG_BUCKETS,
+)
+CONVERSION_QUEUE_WAIT = Histogram(
+    "conversion_queue_wait_seconds",
+    "Time from enqueue to a worker starting the job, per queue",
+    ["queue"],
+    buckets=LONG_BUCKETS,
+)
+# Pools of the worker processes, each prefork child publishes its own and
+# live gauges are summed over the running ones
+WORKER_DB_POOL_CHECKED_OUT = Gauge(
+    "worker_db_pool_checked_out",
+    "Connections in use by worker processes",
+    multiprocess_mode="livesum",
+)
+WORKER_DB_POOL_IDLE = Gauge(
+    "worker_db_pool_idle",
+    "Open connections idle in worker pools",
+    multiprocess_mode="livesum",
+)
+WORKER_DB_POOL_OVERFLOW = Gauge(
+    "worker_db_pool_overflow",
+    "Connections worker pools opened past pool_size",
+    multiprocess_mode="livesum",
+)
+WORKER_DB_POOL_CHECKOUTS = Counter(
+    "worker_db_pool_checkouts",
+    "Connection checkouts in worker processes",
+)
+WORKER_DB_POOL_OVERFLOW_CHECKOUTS = Counter(
+    "worker_db_pool_overflow_checkouts",
+    "Checkouts that went past pool_size in worker processes",
+)
+WORKER_DB_POOL_TIMEOUTS = Counter(
+    "worker_db_pool_timeouts",
+    "Checkouts in worker processes that gave up waiting for a connection",
+)
+WORKER_DB_POOL_WAIT = Counter(
+    "worker_db_pool_wait_seconds",
+    "Time worker processes waited for a connection",
+)
+
+CONVERSION_JOBS = Counter(
+    "conversion_jobs_total",
+    "Finished conversion attempts by outcome",
+    ["status", "error"],
+)
+
+
+class StatsCollector(Collector):
+    """
+    Exposes in-process stats (DB pool, user cache) at scrape time. Callbacks
+    return {name: number} or, for labelled stats, {label: {name: number}}.
+    """
+    def __init__(
+        self,
+        prefix: str,
+        callback: Callable[[], dict],
+        label: str | None = None,
+        counters: tuple[str, ...] = (),
+    ):
+        self.prefix = prefix
+        self.callback = callback
+        self.label = label
+        self.counters = set(counters)
+
+    def collect(self):
+        stats = self.callback()
+        groups = stats.items() if self.label else [(None, stats)]
+
+        families = {}
+        for label_value, values in groups:
+            for name, value in values.items():
+                family = families.get(name)
+                if family is None:
+                    metric_type = CounterMetricFamily if name in self.counters else GaugeMetricFamily
+                    family = families[name] = metric_type(
+                        f"{self.prefix}_{name}",
+                        f"{self.prefix}_{name} as reported by this process",
+                        labels=[self.label] if self.label else [],
+                    )
+                family.add_metric([label_value] if self.label else [], value)
+
+        yield from families.values()
+
+
+def create_registry(collectors: list[Collector] = ()) -> CollectorRegistry:
+    """
+    Registry to serve scrapes from, built once per exporting process.
+    The given collectors describe only that process.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    for collector in collectors:
+        registry.register(collector)
+    return registry
+
+
+def render(registry: CollectorRegistry) -> bytes:
+    return generate_latest(registry)
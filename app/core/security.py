@@ -1,16 +1,36 @@
 from datetime import datetime, timezone, timedelta
 import jwt
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from jwt.exceptions import InvalidTokenError
 from app.core.config import settings
 from app.schemas.auth import TokenPayload
 
-password_hasher = PasswordHash.recommended()
+# Hashes made with other cost parameters still verify, and are flagged
+# for rehashing by verify_and_update_password
+password_hasher = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.PASSWORD_HASH_TIME_COST,
+        memory_cost=settings.PASSWORD_HASH_MEMORY_COST,
+        parallelism=settings.PASSWORD_HASH_PARALLELISM,
+    ),
+))
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_hasher.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+) -> tuple[bool, str | None]:
+    """
+    Returns whether the password matches, and a fresh hash if the stored
+    one was made with outdated cost parameters.
+    """
+    return password_hasher.verify_and_update(plain_password, hashed_password)
+
+
 def hash_password(password: str) -> str:
     return password_hasher.hash(password)
 
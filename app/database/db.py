@@ -1,17 +1,89 @@
 # app/db/db.py
 from sqlmodel import create_engine, Session, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from time import sleep
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.database.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
 
 logger = get_logger(__name__)
 
+
+def _connect_args() -> dict:
+    if settings.DATABASE_URL.startswith("sqlite"):
+        # Local runs only (benchmarks); sessions are used from worker threads
+        return {"check_same_thread": False, "timeout": 30}
+    if settings.DB_STATEMENT_TIMEOUT_MS and settings.DATABASE_URL.startswith("postgresql"):
+        return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,  # log SQL statements if in debug mode
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
 )
 
 
+def async_database_url() -> str:
+    """
+    asyncpg URL for the same database (aiosqlite for SQLite), unless one is
+    configured explicitly.
+    """
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    url = make_url(settings.DATABASE_URL)
+    driver = "sqlite+aiosqlite" if url.get_backend_name() == "sqlite" else "postgresql+asyncpg"
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _async_connect_args() -> dict:
+    if settings.DB_STATEMENT_TIMEOUT_MS and async_database_url().startswith("postgresql"):
+        return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return {}
+
+
+# Used by the request handlers; the workers stay on the sync engine
+async_engine = create_async_engine(
+    async_database_url(),
+    echo=settings.DEBUG,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_async_connect_args(),
+)
+
+
+def reset_pool_after_fork():
+    """
+    Drops connections inherited from the parent process without closing them,
+    so the parent's sockets are left alone and the child opens its own.
+    """
+    engine.dispose(close=False)
+
+
+# pool_stats fields that only ever grow
+POOL_STATS_COUNTERS = ("checkouts", "overflow_checkouts", "timeouts", "wait_seconds_total")
+
+
+def pool_stats() -> dict:
+    return {
+        "sync": engine.pool.stats(),
+        "async": async_engine.pool.stats(),
+    }
+
+
 def wait_for_db(retries: int = 5, delay: int = 3):
     """
     Wait for the database to become available before starting the app.
@@ -42,3 +114,12 @@ def get_db():
     """
     with Session(engine) as session:
         yield session
+
+
+async def get_async_db():
+    """
+    Dependency that provides an async DB session. Objects stay loaded after
+    commit since lazy refreshes can't happen outside the event loop.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
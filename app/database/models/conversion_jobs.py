@@ -1,28 +1,80 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, JSON, BigInteger
 from enum import Enum
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
 class JobStatus(str, Enum):
+    UPLOADING = "UPLOADING"  # waiting for the client's direct upload to storage
     PENDING = "PENDING"
     PROCESSING = "PROCESSING"
     DONE = "DONE"
     FAILED = "FAILED"
 
+class EncodeMode(str, Enum):
+    COPY = "COPY"  # source audio is already MP3, remuxed with -c:a copy
+    ENCODE = "ENCODE"
+
 class ConversionJob(SQLModel, table=True):
     __tablename__="conversion_jobs"
+    __table_args__ = (
+        # Keyset pagination of a user's jobs, newest first
+        Index(
+            "ix_conversion_jobs_user_id_created_at_id",
+            "user_id",
+            "created_at",
+            "id",
+        ),
+        # Reaper scans for expired leases
+        Index(
+            "ix_conversion_jobs_status_lease_expires_at",
+            "status",
+            "lease_expires_at",
+        ),
+    )
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    user_id: int = Field(index=True)
+    user_id: int
 
     input_key: str
+    input_hash: str | None = None
     output_key: str | None = None
+    output_id: UUID | None = Field(default=None, foreign_key="conversion_outputs.id")
+
+    # Probed on upload (see services.probe.MediaInfo), used for scheduling
+    input_size: int | None = Field(default=None, sa_column=Column(BigInteger, nullable=True))
+    duration_seconds: float | None = None
+    media_info: dict | None = Field(default=None, sa_column=Column(JSON, nullable=True))
+
+    # Requested output profiles (see schemas.OutputProfile), None for a plain MP3
+    renditions: list | None = Field(default=None, sa_column=Column(JSON, nullable=True))
 
     status: JobStatus = Field(default=JobStatus.PENDING)
+    encode_mode: EncodeMode | None = None
     error: str | None = None
+    # Transient failures retried so far, see services.retry
+    retry_count: int = Field(default=0)
+
+    # Worker currently converting the job, and until when its claim holds
+    worker_id: str | None = None
+    lease_expires_at: datetime | None = None
+
+    # Conversion queue the job was routed to and when it entered / left it
+    queue: str | None = None
+    queued_at: datetime | None = None
+    started_at: datetime | None = None
+
+    # Updated while ffmpeg runs
+    progress: float | None = None  # percent
+    encode_speed: float | None = None  # media seconds per wall second
+    eta_seconds: int | None = None
 
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
     )
+    # Bumped on every UPDATE of the row (ORM flushes and Core updates alike),
+    # clients use it to skip jobs that didn't change. Lease renewals and
+    # progress updates keep it as is.
     updated_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc)
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
     )
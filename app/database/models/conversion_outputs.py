@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+class ConversionOutput(SQLModel, table=True):
+    """
+    A converted file shared by every job whose input has the same content hash
+    and was encoded with the same parameters.
+    """
+    __tablename__="conversion_outputs"
+    __table_args__ = (
+        Index(
+            "ix_conversion_outputs_input_hash_encode_params",
+            "input_hash",
+            "encode_params",
+            unique=True,
+        ),
+    )
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+
+    input_hash: str
+    encode_params: str
+    output_key: str
+
+    # Number of jobs pointing at output_key; the object is deleted at zero
+    ref_count: int = Field(default=1)
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
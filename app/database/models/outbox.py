@@ -0,0 +1,28 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, JSON, text
+from datetime import datetime, timezone
+
+class OutboxMessage(SQLModel, table=True):
+    """
+    A task to publish to the broker, written in the same transaction as the
+    rows it refers to and published later by the outbox relay.
+    """
+    __tablename__="outbox_messages"
+    __table_args__ = (
+        # The relay only ever scans unsent rows
+        Index(
+            "ix_outbox_messages_unsent",
+            "id",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+    )
+    id: int | None = Field(default=None, primary_key=True)
+
+    task: str
+    args: list = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    queue: str
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+    sent_at: datetime | None = None
@@ -0,0 +1,108 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """
+    Counters describing how connections are handed out, used to size
+    pool_size/max_overflow and Postgres max_connections.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if overflowed:
+                self.overflow_checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_state(self, checked_out: int, idle: int, overflow: int) -> None:
+        """
+        Called after every checkout and checkin, for subclasses that publish
+        the pool's state as it changes
+        """
+        pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.overflow_checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+
+class InstrumentedPoolMixin:
+    """
+    Records how long each checkout waited for a connection and whether it
+    had to go past pool_size into overflow.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # dispose() swaps in a fresh pool, keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+
+        self.metrics.record_checkout(
+            waited=time.perf_counter() - started,
+            overflowed=self.overflow() > 0,
+        )
+        self._record_state()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._record_state()
+
+    def _record_state(self) -> None:
+        self.metrics.record_state(
+            checked_out=self.checkedout(),
+            idle=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.metrics.checkouts,
+            "overflow_checkouts": self.metrics.overflow_checkouts,
+            "timeouts": self.metrics.timeouts,
+            "wait_seconds_total": round(self.metrics.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.metrics.wait_seconds_max, 6),
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
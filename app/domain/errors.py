@@ -7,4 +7,11 @@ class ConversionError(str, Enum):
     FFMPEG_FAILED = "ffmpeg_failed"
     UNSUPPORTED_FORMAT = "unsupported_format"
     UNKNOWN_ERROR = "unknown_error"
-    OUTPUT_NOT_FOUND = "output_not_found"
\ No newline at end of file
+    OUTPUT_NOT_FOUND = "output_not_found"
+    INPUT_TOO_LARGE = "input_too_large"
+    INPUT_TOO_LONG = "input_too_long"
+    STORAGE_ERROR = "storage_error"
+    STORAGE_UNAVAILABLE = "storage_unavailable"
+    DATABASE_ERROR = "database_error"
+    RESOURCE_EXHAUSTED = "resource_exhausted"
+    UPLOAD_ABANDONED = "upload_abandoned"
\ No newline at end of file
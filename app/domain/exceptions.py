@@ -8,6 +8,9 @@ class UserNotFoundException(Exception):
 class InvalidCredentialsException(Exception):
     pass
 
+class PasswordHashingBusyException(Exception):
+    pass
+
 
 # Storage exceptions
 class StorageError(Exception):
@@ -30,5 +33,44 @@ class ConversionJobNotFoundException(Exception):
 class ConversionFailedException(Exception):
     pass
 
+class InvalidMediaException(ConversionFailedException):
+    """
+    The input was rejected before conversion, error is a ConversionError code
+    """
+    def __init__(self, error: str, message: str):
+        super().__init__(message)
+        self.error = error
+
+class MediaTooLargeException(InvalidMediaException):
+    pass
+
+class ProbeUnavailableException(Exception):
+    """
+    ffprobe could not inspect the input (not installed, timed out, input
+    unreachable). Says nothing about the input itself.
+    """
+    pass
+
+class FfmpegKilledException(ConversionFailedException):
+    """
+    ffmpeg was killed by a signal (usually the OOM killer), not a decode error
+    """
+    pass
+
+class ConversionRetryException(Exception):
+    """
+    A transient failure; the job was put back to PENDING and should be
+    retried after countdown seconds
+    """
+    def __init__(self, countdown: float):
+        super().__init__(f"Retry in {countdown:.0f}s")
+        self.countdown = countdown
+
 class JobNotCompletedException(Exception):
     pass
+
+class InvalidCursorException(Exception):
+    pass
+
+class RenditionNotFoundException(Exception):
+    pass
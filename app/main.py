@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST
+import time
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
-from app.database.db import wait_for_db
+from app.core.metrics import HTTP_REQUEST_DURATION, StatsCollector, create_registry, render
+from app.database.db import wait_for_db, pool_stats, async_engine, POOL_STATS_COUNTERS
 from app.api.routers import auth
-from app.services.storage import StorageService
+from app.services.storage import StorageService, build_storage_service
+from app.services.async_storage import AsyncStorageService
+from app.services.events import JobEventHub
+from app.services.user_cache import user_cache
+from app.services.password_pool import PasswordHashingPool
 from app.api.routers import media
 from app.domain.exceptions import StorageError, StoragePermissionError, StorageUnavailableError
 from sys import exit
@@ -21,7 +28,8 @@ async def lifespan(app: FastAPI):
     wait_for_db()
 
     try:
-        app.state.storage_service = StorageService()
+        app.state.storage_service = build_storage_service()
+        app.state.async_storage_service = AsyncStorageService(app.state.storage_service)
         logger.info("Object Storage service initialized")
     except StoragePermissionError:
         logger.critical(f"Storage permission error at startup")
@@ -33,7 +41,26 @@ async def lifespan(app: FastAPI):
         logger.critical(f"Storage initialization failed")
         exit(1)
 
+    app.state.job_event_hub = JobEventHub(settings.RABBITMQ_URL)
+    app.state.job_event_hub.start()
+
+    app.state.password_pool = PasswordHashingPool()
+
+    app.state.metrics_registry = create_registry([
+        StatsCollector(
+            "db_pool",
+            pool_stats,
+            label="engine",
+            counters=POOL_STATS_COUNTERS,
+        ),
+        StatsCollector("user_cache", user_cache.stats, counters=("hits", "misses")),
+    ])
+
     yield
+    app.state.password_pool.shutdown()
+    app.state.job_event_hub.stop()
+    await async_engine.dispose()
+    logger.info(f"User cache stats: {user_cache.stats()}")
     logger.info("Application shutdown")
 
 
@@ -42,6 +69,27 @@ app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 app.include_router(auth.router)
 app.include_router(media.router)
 
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Route templates, not raw paths, so job ids don't explode the label set
+    route = request.scope.get("route")
+    HTTP_REQUEST_DURATION.labels(
+        request.method,
+        route.path if route else "unmatched",
+        response.status_code,
+    ).observe(time.perf_counter() - started)
+    return response
+
 @app.get("/")
 def root():
     return {"message": f"video-to-mp3 app is running"}
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "db_pool": pool_stats()}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    return Response(render(request.app.state.metrics_registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,13 +1,110 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, AfterValidator, model_validator
+from typing import Any, Annotated
+from enum import Enum
 from uuid import UUID
 from datetime import datetime
-from app.database.models.conversion_jobs import JobStatus
+from app.database.models.conversion_jobs import JobStatus, EncodeMode
+
+
+class AudioCodec(str, Enum):
+    MP3 = "mp3"
+    AAC = "aac"
+    OPUS = "opus"
+
+
+SAMPLE_RATES = {
+    AudioCodec.MP3: {8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000},
+    AudioCodec.AAC: {8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000},
+    AudioCodec.OPUS: {8000, 12000, 16000, 24000, 48000},
+}
+
+MAX_OUTPUT_PROFILES = 5
+
+
+class OutputProfile(BaseModel):
+    """
+    One rendition to produce from the input. Sample rate and channels default
+    to the source's.
+    """
+    name: str | None = Field(None, pattern=r"^[a-z0-9][a-z0-9_-]{0,31}$")
+    codec: AudioCodec = AudioCodec.MP3
+    bitrate: int = Field(192, ge=32, le=320) # kbps, the target average when vbr is set
+    vbr: bool = False
+    sample_rate: int | None = None
+    channels: int | None = Field(None, ge=1, le=2)
+
+    @model_validator(mode="after")
+    def check_profile(self):
+        if self.sample_rate is not None and self.sample_rate not in SAMPLE_RATES[self.codec]:
+            raise ValueError(f"Sample rate {self.sample_rate} is not supported by {self.codec.value}")
+        if self.name is None:
+            self.name = f"{self.codec.value}-{self.bitrate}k" + ("-vbr" if self.vbr else "")
+        return self
+
+
+def _unique_names(profiles: list[OutputProfile]) -> list[OutputProfile]:
+    names = [profile.name for profile in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError("Output profile names must be unique")
+    return profiles
+
+
+OutputProfiles = Annotated[
+    list[OutputProfile],
+    Field(min_length=1, max_length=MAX_OUTPUT_PROFILES),
+    AfterValidator(_unique_names),
+]
+
 
 class ConversionJobRead(BaseModel):
     id: UUID
     status: JobStatus
     created_at: datetime
+    updated_at: datetime | None = None
     error: str | None
+    retry_count: int = 0
+    encode_mode: EncodeMode | None = None
+    progress: float | None = None
+    encode_speed: float | None = None
+    eta_seconds: int | None = None
+    input_size: int | None = None
+    duration_seconds: float | None = None
+    # None for a plain MP3 job
+    renditions: list[OutputProfile] | None = None
 
     class Config:
         from_attributes = True
+
+
+MAX_STATUS_BATCH_IDS = 100
+
+
+class JobStatusBatchRequest(BaseModel):
+    ids: list[UUID] = Field(..., min_length=1, max_length=MAX_STATUS_BATCH_IDS)
+    # Only return jobs updated after this time, e.g. as_of of the previous poll
+    since: datetime | None = None
+
+
+class JobStatusBatchRead(BaseModel):
+    # Jobs that don't exist, aren't the user's, or are unchanged since `since` are left out
+    jobs: dict[UUID, ConversionJobRead]
+    as_of: datetime
+
+
+class UploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    # Renditions to produce instead of the default MP3
+    profiles: OutputProfiles | None = None
+
+
+class PresignedUploadRead(BaseModel):
+    job: ConversionJobRead
+    upload_url: str
+    expires_at: datetime
+
+
+class ConversionJobPage(BaseModel):
+    # Items hold only the requested fields when a sparse fieldset is used
+    items: list[dict[str, Any]]
+    next_cursor: str | None
@@ -0,0 +1,92 @@
+from functools import partial
+from typing import AsyncIterator, Callable, TypeVar, IO
+from datetime import timedelta
+import anyio
+from anyio import CapacityLimiter
+from app.core.config import settings
+from app.services.storage import StorageService
+
+T = TypeVar("T")
+
+
+class AsyncStorageService:
+    """
+    Async facade over StorageService for request handlers.
+
+    Blocking client calls run on worker threads gated by a dedicated limiter,
+    separate from Starlette's default threadpool, so slow storage can't
+    starve unrelated endpoints. Downloads only hold a thread while a chunk
+    is being read, not while the client is receiving it.
+    """
+    def __init__(self, storage: StorageService, max_concurrency: int | None = None):
+        self.storage = storage
+        self.limiter = CapacityLimiter(max_concurrency or settings.STORAGE_IO_CONCURRENCY)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a blocking callable on the storage threads.
+        """
+        return await anyio.to_thread.run_sync(
+            partial(func, *args, **kwargs),
+            limiter=self.limiter,
+        )
+
+    async def upload_file(
+        self,
+        object_name: str,
+        file,
+        content_type: str,
+        length: int | None = None,
+    ) -> None:
+        await self.run(
+            self.storage.upload_file,
+            object_name=object_name,
+            file=file,
+            content_type=content_type,
+            length=length,
+        )
+
+    async def stat_file(self, object_name: str):
+        return await self.run(self.storage.stat_file, object_name)
+
+    async def download_file(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+    ) -> IO[bytes]:
+        return await self.run(
+            self.storage.download_file,
+            object_name,
+            offset=offset,
+            length=length,
+        )
+
+    async def delete_file(self, object_name: str) -> None:
+        await self.run(self.storage.delete_file, object_name)
+
+    def get_presigned_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(minutes=15),
+        public: bool = False,
+        response_headers: dict[str, str] | None = None,
+    ) -> str:
+        # Signing is local, there is nothing to offload
+        return self.storage.get_presigned_url(
+            object_name,
+            expires=expires,
+            public=public,
+            response_headers=response_headers,
+        )
+
+    async def iter_file(self, obj, chunk_size: int = 32 * 1024) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await self.run(obj.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            obj.close()
+            obj.release_conn()
@@ -1,6 +1,10 @@
-from sqlmodel import Session, select
+from datetime import datetime, timezone
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database.models.user import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import create_access_token
+from app.services.password_pool import PasswordHashingPool
+from app.services.user_cache import user_cache
 from app.domain.exceptions import (
     UsernameAlreadyExistsException,
     UserNotFoundException,
@@ -8,43 +12,67 @@ from app.domain.exceptions import (
 )
 
 class AuthService:
-    def __init__(self, db: Session):
+    """
+    Password hashing runs on the hashing pool and the DB is queried through
+    an async session, so neither blocks the event loop.
+    """
+    def __init__(self, db: AsyncSession, hashing_pool: PasswordHashingPool):
         self.db = db
-    
-    def register(self, username: str, password: str) -> User | None:
-        existing_user = self.db.exec(
+        self.hashing_pool = hashing_pool
+
+    async def _get_user(self, username: str) -> User | None:
+        result = await self.db.exec(
             select(User).where(User.username == username)
-        ).first()
+        )
+        return result.first()
+
+    async def _save(self, user: User) -> None:
+        self.db.add(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+    
+    async def register(self, username: str, password: str) -> User | None:
+        existing_user = await self._get_user(username)
 
         if existing_user:
             raise UsernameAlreadyExistsException()
 
-        password_hash = hash_password(password)
+        password_hash = await self.hashing_pool.hash(password)
 
         user = User(
             username=username,
             password_hash=password_hash,
+            # users.created_at is a naive UTC column and asyncpg,
+            # unlike psycopg, refuses aware datetimes for it
+            created_at=datetime.now(timezone.utc).replace(tzinfo=None),
         )
 
-        self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self._save(user)
+
+        # Drop anything cached under this name before the user existed
+        await user_cache.ainvalidate(username)
 
         return user
 
-    def authenticate(self, username: str, password: str) -> User | None:
-        user = self.db.exec(
-            select(User).where(User.username == username)
-        ).first()
+    async def authenticate(self, username: str, password: str) -> User | None:
+        user = await self._get_user(username)
 
         if not user:
             raise UserNotFoundException()
 
-        if not verify_password(password, user.password_hash):
+        valid, updated_hash = await self.hashing_pool.verify_and_update(
+            password, user.password_hash
+        )
+        if not valid:
             raise InvalidCredentialsException()
 
+        # Hash was made with old cost parameters, store the upgraded one
+        if updated_hash:
+            user.password_hash = updated_hash
+            await self._save(user)
+
         return user
 
-    def login(self, username: str, password: str) -> str | None:
-        user = self.authenticate(username, password)
+    async def login(self, username: str, password: str) -> str | None:
+        user = await self.authenticate(username, password)
         return create_access_token(subject=user.username)
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+
+class Cache(ABC):
+    # Whether calls do network I/O, async callers offload those to a thread
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> dict | None:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: dict, ttl: int) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
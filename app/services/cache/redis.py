@@ -0,0 +1,27 @@
+import json
+from app.services.cache.base import Cache
+
+class RedisCache(Cache):
+    """
+    Cache shared by every API process. Needs the `redis` package.
+    """
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "cache:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis cache backend needs `pip install redis`") from e
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> dict | None:
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: dict, ttl: int) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
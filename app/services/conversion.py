@@ -1,111 +1,756 @@
 import subprocess
 import tempfile
+import threading
+import math
 import os
-from sqlmodel import Session, select
-from app.database.models.conversion_jobs import ConversionJob, JobStatus
-from app.services.storage import StorageService
+from datetime import datetime, timezone
+from uuid import UUID
+from concurrent.futures import ThreadPoolExecutor
+from sqlmodel import Session
+from sqlalchemy import update, or_, and_, func
+from sqlalchemy.exc import IntegrityError, DBAPIError
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import CONVERSION_STAGE_DURATION, CONVERSION_QUEUE_WAIT, CONVERSION_JOBS
+from app.database.models.conversion_jobs import ConversionJob, JobStatus, EncodeMode
+from app.database.models.conversion_outputs import ConversionOutput
+from app.services.storage import StorageService, build_storage_service
+from app.services.probe import probe_media, MediaInfo
+from app.services.events import publish_job_event
+from app.services.ffmpeg import FfmpegProcess, run_ffmpeg
+from app.services.mp3 import Mp3File, encoder_sample_rate, frame_samples, join_frames
+from app.services.progress import ProgressReporter
+from app.services.lease import LeaseHeartbeat, lease_expiry, worker_id
+from app.services.input_cache import InputCache
+from app.services.retry import classify_failure, retry_delay
+from app.services.renditions import CODECS, output_args, rendition_key
+from app.schemas.conversion_jobs import OutputProfile
 from app.domain.errors import ConversionError
 from app.domain.exceptions import (
     ConversionFailedException,
-    StorageError
+    ConversionRetryException,
+    FfmpegKilledException,
+    ProbeUnavailableException,
+    StorageError,
+    StorageUnavailableError,
 )
 
+logger = get_logger(__name__)
+
+STREAM_CHUNK_SIZE = 32 * 1024
+
+# ISO base media (mp4/mov) box types we care about when sniffing the layout
+MP4_HEADER_BOX = b"ftyp"
+MP4_METADATA_BOXES = (b"moov", b"moof")
+MP4_MEDIA_DATA_BOX = b"mdat"
+MP4_MAX_BOXES = 32
+
+# Segmented encoding: segments are cut from the decoded samples on MP3 frame
+# boundaries and overlap by a few frames on either side, so the frames around
+# every join are encoded from the same audio by both segments. A join can
+# move off the nominal boundary by up to the slack, the frames beyond it give
+# the encoder time to settle at the start of a segment and to flush at its end
+SEGMENT_OVERLAP_FRAMES = 6
+SEGMENT_JOIN_SLACK_FRAMES = 3
+DEFAULT_SAMPLE_RATE = 44100
+
+# Identifies how outputs were encoded, so cached outputs are only reused
+# for jobs that would have produced the same file
+ENCODE_PARAMS = "mp3:libmp3lame"
+
+
 class ConversionService:
-    def __init__(self, db: Session, storage: StorageService | None = None):
+    def __init__(
+        self,
+        db: Session,
+        storage: StorageService | None = None,
+        input_cache: InputCache | None = None,
+    ):
         self.db = db
-        self.storage = storage or StorageService()
+        self.storage = storage or build_storage_service()
+        self.input_cache = input_cache or InputCache()
 
 
-    def process(self, job_id: str) -> None:
-        job = self.db.exec(
-            select(ConversionJob).where(ConversionJob.id == job_id)
-        ).first()
+    def process(self, job_id: UUID) -> None:
+        """
+        Converts the job. Permanent failures fail the job. Transient ones put
+        it back to PENDING and raise ConversionRetryException, until the job
+        used up CONVERSION_MAX_RETRIES.
+        """
+        job = self._claim(job_id)
 
+        # Duplicate delivery of a finished job, or of one a live worker holds
         if not job:
+            logger.info(f"Job {job_id} is not claimable, skipping")
             return
 
-        job.status = JobStatus.PROCESSING
-        self.db.commit()
+        if not job.retry_count:
+            self._log_queue_wait(job)
+        publish_job_event(job)
 
+        failure, retry_in = None, None
         try:
-            output_key = self._convert(job)
+            with LeaseHeartbeat(job.id, self.db.get_bind()):
+                output_key = self._convert(job)
             job.output_key = output_key
             job.status = JobStatus.DONE
+            job.progress = 100.0
+            job.eta_seconds = 0
 
-        except ConversionFailedException as e:
-            job.status = JobStatus.FAILED
-            job.error = ConversionError.FFMPEG_FAILED
+            # The dedup cache only holds plain MP3s (ENCODE_PARAMS), never
+            # renditions, whose codec and bitrate were picked by the client
+            if job.input_hash and not job.renditions:
+                output = self._register_output(job.input_hash, output_key)
+                if output:
+                    job.output_id = output.id
 
-        except StorageError as e:
-            job.status = JobStatus.FAILED
-            job.error = ConversionError.STORAGE_ERROR
+        except Exception as e:
+            failure = e
+            if isinstance(e, DBAPIError):
+                # The session can't be used until the failed transaction is gone
+                self.db.rollback()
 
-        except Exception:
-            job.status = JobStatus.FAILED
-            job.error = ConversionError.UNKNOWN_ERROR
-            raise 
+            error, transient = classify_failure(e)
+            job.error = error.value
+            if transient and job.retry_count < settings.CONVERSION_MAX_RETRIES:
+                job.retry_count += 1
+                job.status = JobStatus.PENDING
+                retry_in = retry_delay(job.retry_count)
+                logger.warning(
+                    f"Job {job.id} failed with {error.value}, "
+                    f"retry {job.retry_count} in {retry_in:.0f}s: {e}"
+                )
+            else:
+                job.status = JobStatus.FAILED
+                if error == ConversionError.UNKNOWN_ERROR:
+                    logger.exception(f"Job {job.id} failed")
+                else:
+                    logger.warning(f"Job {job.id} failed with {error.value}: {e}")
 
         finally:
+            job.lease_expires_at = None
             self.db.commit()
+            publish_job_event(job)
+            CONVERSION_JOBS.labels(
+                status=job.status.value,
+                error=job.error or "",
+            ).inc()
+
+        # Kept for the retry, unless the job is finished
+        if retry_in is None:
+            self.input_cache.discard(job.id)
+        else:
+            raise ConversionRetryException(retry_in) from failure
+
+    def _claim(self, job_id: UUID) -> ConversionJob | None:
+        """
+        Atomically takes the job for this worker with a lease. Claimable are
+        PENDING jobs (new or waiting for a retry) and PROCESSING jobs whose
+        lease expired (their worker died).
+        """
+        now = datetime.now(timezone.utc)
+        claimed_id = self.db.execute(
+            update(ConversionJob)
+            .where(
+                ConversionJob.id == job_id,
+                or_(
+                    ConversionJob.status == JobStatus.PENDING,
+                    and_(
+                        ConversionJob.status == JobStatus.PROCESSING,
+                        ConversionJob.lease_expires_at < now,
+                    ),
+                ),
+            )
+            .values(
+                status=JobStatus.PROCESSING,
+                worker_id=worker_id(),
+                lease_expires_at=lease_expiry(),
+                started_at=func.coalesce(ConversionJob.started_at, now),
+                error=None,
+            )
+            .returning(ConversionJob.id)
+        ).scalar_one_or_none()
+        self.db.commit()
+
+        if claimed_id is None:
+            return None
+        return self.db.get(ConversionJob, claimed_id)
+
+
+    def _log_queue_wait(self, job: ConversionJob) -> None:
+        if job.queued_at is None:
+            return
+        # Columns come back naive and hold UTC, values set in this process are aware
+        queued_at, started_at = (
+            value.replace(tzinfo=value.tzinfo or timezone.utc)
+            for value in (job.queued_at, job.started_at)
+        )
+        wait = (started_at - queued_at).total_seconds()
+        CONVERSION_QUEUE_WAIT.labels(job.queue or "unknown").observe(wait)
+        logger.info(f"Job {job.id} waited {wait:.1f}s in {job.queue}")
+
+    def _register_output(self, input_hash: str, output_key: str) -> ConversionOutput | None:
+        """
+        Publishes the output in the dedup cache so later uploads of the same
+        content can reuse it. Returns None if another job registered first,
+        in which case this job keeps its output to itself.
+        """
+        output = ConversionOutput(
+            input_hash=input_hash,
+            encode_params=ENCODE_PARAMS,
+            output_key=output_key,
+        )
+        try:
+            with self.db.begin_nested():
+                self.db.add(output)
+        except IntegrityError:
+            return None
+
+        return output
+
+
+    def _probe_input(self, job: ConversionJob) -> MediaInfo | None:
+        # Probed when the upload was validated
+        if job.media_info:
+            return MediaInfo.model_validate(job.media_info)
+
+        input_key = job.input_key
+        try:
+            source = self.storage.local_path(input_key) or self.storage.get_presigned_url(input_key)
+            return probe_media(source)
+        except (ConversionFailedException, ProbeUnavailableException, StorageError) as e:
+            logger.warning(f"Could not probe {input_key}: {e}")
+            return None
+
+
+    @staticmethod
+    def _select_encode_mode(media_info: MediaInfo | None) -> EncodeMode:
+        """
+        Picks a plain remux when the audio track is already MP3. Unprobed
+        inputs are re-encoded and ffmpeg has the final say.
+        """
+        if media_info and media_info.audio_codec == "mp3":
+            return EncodeMode.COPY
+        return EncodeMode.ENCODE
+
+
+    @staticmethod
+    def _should_segment(encode_mode: EncodeMode, media_info: MediaInfo | None) -> bool:
+        return (
+            encode_mode == EncodeMode.ENCODE
+            and settings.CONVERSION_SEGMENT_COUNT > 1
+            and media_info is not None
+            and media_info.duration is not None
+            and media_info.duration >= settings.CONVERSION_SEGMENT_MIN_DURATION
+        )
+
+
+    @staticmethod
+    def _audio_codec_args(encode_mode: EncodeMode) -> list[str]:
+        if encode_mode == EncodeMode.COPY:
+            return ["-c:a", "copy"]
+        return ["-acodec", "libmp3lame"]
 
 
     def _convert(self, job: ConversionJob) -> str:
+        output_key = f"audio/{job.user_id}/{job.id}.mp3"
+        with CONVERSION_STAGE_DURATION.labels("probe").time():
+            media_info = self._probe_input(job)
+        reporter = ProgressReporter(
+            job.id,
+            self.db.get_bind(),
+            media_info.duration if media_info else None,
+        )
+
+        if job.renditions:
+            job.encode_mode = EncodeMode.ENCODE
+            return self._convert_renditions(job, reporter)
+
+        job.encode_mode = self._select_encode_mode(media_info)
+        segmented = self._should_segment(job.encode_mode, media_info)
+
+        # Containers that can be demuxed front-to-back are piped straight
+        # from storage through ffmpeg and back to storage, without touching disk.
+        # Long inputs are encoded in parallel segments instead, which needs
+        # a seekable local copy.
+        if not segmented and self._can_stream(job):
+            try:
+                # Download, encode and upload overlap, so they are timed as one
+                with CONVERSION_STAGE_DURATION.labels("stream").time():
+                    self._convert_streaming(job.input_key, output_key, job.encode_mode, reporter)
+                return output_key
+            except FfmpegKilledException:
+                # Out of resources, not a container problem
+                raise
+            except ConversionFailedException as e:
+                logger.warning(
+                    f"Streaming conversion failed for job {job.id}, "
+                    f"falling back to temp file: {e}"
+                )
+
         # ffmpeg only works with directories
         # So, we download the video from minio, save it to temp dir
         # Then use ffmpeg to process it, and save the mp3 back to temp dir
         # Then, we open this mp3 in read-binary mode, and upload to minio
         with tempfile.TemporaryDirectory() as tmp:
-            input_path = os.path.join(tmp, "input")
+            input_path = self._input_path(job)
             output_path = os.path.join(tmp, "output.mp3")
 
-            self._download_to_file(job.input_key, input_path)
-            self._run_ffmpeg(input_path, output_path)
+            with CONVERSION_STAGE_DURATION.labels("ffmpeg").time():
+                if segmented:
+                    self._run_ffmpeg_segmented(input_path, output_path, media_info, tmp, reporter)
+                else:
+                    self._run_ffmpeg(input_path, output_path, job.encode_mode, reporter)
 
-            output_key = f"audio/{job.user_id}/{job.id}.mp3"
-            self._upload_mp3(output_path, output_key)
+            with CONVERSION_STAGE_DURATION.labels("upload").time():
+                self._upload_mp3(output_path, output_key)
 
             return output_key
 
 
+    def _convert_renditions(self, job: ConversionJob, reporter: ProgressReporter) -> str:
+        """
+        Produces every requested rendition with a single ffmpeg process. The
+        input is demuxed and decoded once and the decoded audio is fed to one
+        encoder per output. Returns the key of the first rendition.
+        """
+        profiles = [OutputProfile.model_validate(profile) for profile in job.renditions]
+        streaming = self._can_stream(job)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = []
+            encoder_args = []
+            for profile in profiles:
+                path = os.path.join(tmp, f"{profile.name}.{CODECS[profile.codec].extension}")
+                encoder_args += [*output_args(profile), path]
+                outputs.append((profile, path))
+
+            if streaming:
+                try:
+                    # Includes reading the input, which is piped in as it downloads
+                    with CONVERSION_STAGE_DURATION.labels("stream").time():
+                        self._run_ffmpeg_from_storage(
+                            job.input_key,
+                            ["-y", "-i", "pipe:0", "-vn", *encoder_args],
+                            reporter,
+                        )
+                except FfmpegKilledException:
+                    # Out of resources, not a container problem
+                    raise
+                except ConversionFailedException as e:
+                    logger.warning(
+                        f"Streaming conversion failed for job {job.id}, "
+                        f"falling back to temp file: {e}"
+                    )
+                    streaming = False
+
+            if not streaming:
+                input_path = self._input_path(job)
+                with CONVERSION_STAGE_DURATION.labels("ffmpeg").time():
+                    run_ffmpeg(
+                        ["-y", "-i", input_path, "-vn", *encoder_args],
+                        on_progress=reporter.for_process(),
+                    )
+
+            output_keys = []
+            with CONVERSION_STAGE_DURATION.labels("upload").time():
+                for profile, path in outputs:
+                    key = rendition_key(job.user_id, job.id, profile)
+                    self.storage.upload_path(key, path, CODECS[profile.codec].content_type)
+                    output_keys.append(key)
+
+        return output_keys[0]
+
+
+    def _run_ffmpeg_from_storage(
+        self,
+        input_key: str,
+        args: list[str],
+        reporter: ProgressReporter,
+    ) -> None:
+        """
+        Runs ffmpeg with the object streamed into its stdin (args read pipe:0)
+        """
+        obj = self.storage.download_file(input_key)
+        ffmpeg = FfmpegProcess(
+            args,
+            on_progress=reporter.for_process(),
+            stdin=subprocess.PIPE,
+        )
+
+        feed_errors: list[Exception] = []
+        feeder = threading.Thread(
+            target=self._feed_stdin,
+            args=(obj, ffmpeg.stdin, feed_errors),
+            daemon=True,
+        )
+        feeder.start()
+
+        try:
+            returncode = ffmpeg.wait()
+        finally:
+            feeder.join()
+            obj.close()
+            obj.release_conn()
+
+        if feed_errors:
+            raise StorageUnavailableError(
+                f"Failed to stream {input_key} from storage"
+            ) from feed_errors[0]
+
+        if returncode != 0:
+            raise ffmpeg.failure(returncode)
+
+
+    def _convert_streaming(
+        self,
+        input_key: str,
+        output_key: str,
+        encode_mode: EncodeMode,
+        reporter: ProgressReporter,
+    ) -> None:
+        """
+        Feeds the object stream into ffmpeg's stdin and uploads ffmpeg's stdout
+        as it is produced. Memory use is bounded by the upload part size.
+        """
+        obj = self.storage.download_file(input_key)
+        ffmpeg = FfmpegProcess(
+            [
+                "-i", "pipe:0",
+                "-vn",
+                *self._audio_codec_args(encode_mode),
+                "-f", "mp3",
+                "pipe:1",
+            ],
+            on_progress=reporter.for_process(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+        feed_errors: list[Exception] = []
+        feeder = threading.Thread(
+            target=self._feed_stdin,
+            args=(obj, ffmpeg.stdin, feed_errors),
+            daemon=True,
+        )
+        feeder.start()
+
+        try:
+            self.storage.upload_file(
+                object_name=output_key,
+                file=ffmpeg.stdout,
+                content_type="audio/mpeg",
+            )
+        except BaseException:
+            # Nothing drains stdout anymore, ffmpeg would block on it forever
+            ffmpeg.kill()
+            raise
+        finally:
+            returncode = ffmpeg.wait()
+            feeder.join()
+            ffmpeg.stdout.close()
+            obj.close()
+            obj.release_conn()
+
+        if feed_errors:
+            self.storage.delete_file(output_key)
+            raise StorageUnavailableError(
+                f"Failed to stream {input_key} from storage"
+            ) from feed_errors[0]
+
+        if returncode != 0:
+            self.storage.delete_file(output_key)
+            raise ffmpeg.failure(returncode)
+
+
+    @staticmethod
+    def _feed_stdin(obj, stdin, errors: list[Exception]) -> None:
+        try:
+            for chunk in obj.stream(STREAM_CHUNK_SIZE):
+                stdin.write(chunk)
+        except BrokenPipeError:
+            # ffmpeg exited early, its return code tells us why
+            pass
+        except Exception as e:
+            errors.append(e)
+        finally:
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
+
+
+    def _can_stream(self, job: ConversionJob) -> bool:
+        # Files the backend keeps locally are read by ffmpeg in place, which
+        # beats piping them through this process. Retries download the input
+        # once into the input cache instead, so further retries reuse it.
+        return (
+            settings.CONVERSION_STREAMING_ENABLED
+            and not job.retry_count
+            and self.storage.local_path(job.input_key) is None
+            and not self._requires_seekable_input(job.input_key)
+        )
+
+
+    def _requires_seekable_input(self, key: str) -> bool:
+        """
+        Checks whether the input can only be demuxed from a seekable file.
+
+        MP4/MOV files written without faststart keep the moov atom after mdat,
+        so ffmpeg must seek to the end before it can decode anything. Other
+        containers (mkv, webm) are read front-to-back.
+        """
+        size = self.storage.stat_file(key).size
+        offset = 0
+        for index in range(MP4_MAX_BOXES):
+            if offset + 8 > size:
+                # Reached the end without seeing the metadata box
+                return index > 0
+
+            header = self._read_range(key, offset, min(16, size - offset))
+            box_size = int.from_bytes(header[0:4], "big")
+            box_type = header[4:8]
+
+            if index == 0 and box_type != MP4_HEADER_BOX:
+                return False
+            if box_type in MP4_METADATA_BOXES:
+                return False
+            if box_type == MP4_MEDIA_DATA_BOX:
+                return True
+
+            if box_size == 1 and len(header) == 16:
+                box_size = int.from_bytes(header[8:16], "big")
+            if box_size < 8:
+                # Box runs to end of file (size 0) or header is corrupt
+                return True
+
+            offset += box_size
+
+        return True
+
+
+    def _read_range(self, key: str, offset: int, length: int) -> bytes:
+        obj = self.storage.download_file(key, offset=offset, length=length)
+        try:
+            return obj.read()
+        finally:
+            obj.close()
+            obj.release_conn()
+
+
+    def _input_path(self, job: ConversionJob) -> str:
+        """
+        Path ffmpeg reads the input from: the object file itself when the
+        backend keeps it locally, otherwise a downloaded copy, which stays in
+        the input cache until the job is finished.
+        """
+        local_path = self.storage.local_path(job.input_key)
+        if local_path:
+            return local_path
+
+        cached_path = self.input_cache.get(job.id, job.input_size)
+        if cached_path:
+            logger.info(f"Reusing the input downloaded for job {job.id}")
+            return cached_path
+
+        with CONVERSION_STAGE_DURATION.labels("download").time():
+            return self.input_cache.fill(
+                job.id,
+                lambda path: self._download_to_file(job.input_key, path),
+            )
+
+
     def _download_to_file(self, key: str, path: str) -> None:
         obj = self.storage.download_file(key)
         try:
             with open(path, "wb") as f:
-                for chunk in obj.stream(32 * 1024):
+                for chunk in obj.stream(STREAM_CHUNK_SIZE):
                     f.write(chunk)
         finally:
             obj.close()
             obj.release_conn()
-        
 
-    def _upload_mp3(self, path: str, key: str) -> None:
-        with open(path, "rb") as f:
-            self.storage.upload_file(
-                object_name=key,
-                file=f,
-                content_type="audio/mpeg",
-            )
 
+    def _upload_mp3(self, path: str, key: str) -> None:
+        self.storage.upload_path(key, path, "audio/mpeg")
 
-    def _run_ffmpeg(self, input_path: str, output_path: str) -> None:
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i", input_path,
-            "-vn",
-            "-acodec", "libmp3lame",
-            output_path,
-        ]
 
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+    def _run_ffmpeg(
+        self,
+        input_path: str,
+        output_path: str,
+        encode_mode: EncodeMode = EncodeMode.ENCODE,
+        reporter: ProgressReporter | None = None,
+    ) -> None:
+        run_ffmpeg(
+            [
+                "-y",
+                "-i", input_path,
+                "-vn",
+                *self._audio_codec_args(encode_mode),
+                "-f", "mp3",
+                output_path,
+            ],
+            on_progress=reporter.for_process() if reporter else None,
         )
 
-        if result.returncode != 0:
-            raise ConversionFailedException(
-                f"ffmpeg failed: {result.stderr.strip()}"
+
+    def _run_ffmpeg_segmented(
+        self,
+        input_path: str,
+        output_path: str,
+        media_info: MediaInfo,
+        workdir: str,
+        reporter: ProgressReporter | None = None,
+    ) -> None:
+        """
+        Encodes overlapping segments of the input in parallel and joins their
+        MP3 frames into one gapless file (no re-encode).
+
+        Every segment starts on a frame boundary of the whole output, so its
+        frames line up with the frames a single pass would have written. The
+        join takes the earlier segment's frames up to a frame boundary inside
+        the overlap and the later segment's from there on, which drops the
+        encoder delay and padding of both along with the overlap. Segments are
+        encoded without the bit reservoir, so no kept frame keeps part of its
+        audio in a dropped one.
+
+        Each segment is its own ffmpeg process, so a thread pool is enough to
+        spread the work over all cores; Celery's prefork children are daemonic
+        and cannot host a multiprocessing pool anyway.
+        """
+        sample_rate = encoder_sample_rate(media_info.sample_rate or DEFAULT_SAMPLE_RATE)
+        samples_per_frame = frame_samples(sample_rate)
+        total_frames = math.ceil(media_info.duration * sample_rate / samples_per_frame)
+        frames_per_segment = math.ceil(total_frames / settings.CONVERSION_SEGMENT_COUNT)
+        boundaries = list(range(0, total_frames, frames_per_segment))
+
+        segments = []
+        for index, boundary in enumerate(boundaries):
+            first_frame = max(boundary - SEGMENT_OVERLAP_FRAMES, 0)
+            # The last segment runs to the end so rounding never drops audio
+            end_frame = (
+                boundaries[index + 1] + SEGMENT_OVERLAP_FRAMES
+                if index + 1 < len(boundaries)
+                else None
             )
+            segments.append({
+                "path": os.path.join(workdir, f"segment_{index:03d}.mp3"),
+                "boundary": boundary,
+                "first_frame": first_frame,
+                "start": first_frame * samples_per_frame,
+                "end": end_frame * samples_per_frame if end_frame is not None else None,
+            })
+
+        with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+            futures = [
+                pool.submit(
+                    self._encode_segment,
+                    input_path,
+                    segment["path"],
+                    segment["start"],
+                    segment["end"],
+                    sample_rate,
+                    reporter.for_process(index) if reporter else None,
+                )
+                for index, segment in enumerate(segments)
+            ]
+            for future in futures:
+                future.result()
+
+        parts = [Mp3File(segments[0]["path"])]
+        try:
+            plan = [[parts[0], 0, None]]
+            for previous, segment in zip(segments, segments[1:]):
+                # A segment that came out short holds the end of the audio,
+                # the container's duration overstated its length
+                if parts[-1].samples < previous["end"] - previous["start"]:
+                    break
+
+                part = Mp3File(segment["path"])
+                parts.append(part)
+                join = self._find_join(
+                    parts[-2], previous["first_frame"],
+                    part, segment["first_frame"],
+                    segment["boundary"],
+                )
+                if join is None:
+                    logger.warning(
+                        f"No clean join between segments at frame {segment['boundary']} "
+                        f"of {input_path}, encoding it in a single pass"
+                    )
+                    self._run_ffmpeg(input_path, output_path, EncodeMode.ENCODE, reporter)
+                    return
+
+                plan[-1][2] = join - previous["first_frame"]
+                plan.append([part, join - segment["first_frame"], None])
 
+            plan[-1][2] = len(plan[-1][0].frames)
+            join_frames(output_path, [tuple(entry) for entry in plan])
+        finally:
+            for part in parts:
+                part.close()
+
+
+    @staticmethod
+    def _find_join(
+        earlier: Mp3File,
+        earlier_first_frame: int,
+        later: Mp3File,
+        later_first_frame: int,
+        boundary: int,
+    ) -> int | None:
+        """
+        Picks the frame the later segment takes over from, as close to the
+        boundary as possible. Its first kept frame must not borrow from the
+        bit reservoir, and the window of the earlier segment's last kept
+        frame must match the later segment's own, so the overlapping windows
+        of the two encodes still cancel out.
+        """
+        for offset in sorted(range(-SEGMENT_JOIN_SLACK_FRAMES, SEGMENT_JOIN_SLACK_FRAMES + 1), key=abs):
+            join = boundary + offset
+            earlier_last = join - 1 - earlier_first_frame
+            later_first = join - later_first_frame
+            if (
+                later_first >= 1
+                and later_first < len(later.frames)
+                and earlier_last < len(earlier.frames)
+                and later.main_data_begin(later_first) == 0
+                and earlier.block_types(earlier_last) == later.block_types(later_first - 1)
+            ):
+                return join
+        return None
+
+
+    def _encode_segment(
+        self,
+        input_path: str,
+        output_path: str,
+        start: int,
+        end: int | None,
+        sample_rate: int,
+        on_progress=None,
+    ) -> None:
+        """
+        Encodes samples [start, end) of the input. They are counted on the
+        decoded audio from the beginning of the file rather than seeked to,
+        so every segment agrees with the others to the sample; demuxing and
+        decoding are cheap next to the encode.
+        """
+        trim = f"start_sample={start}"
+        if end is not None:
+            trim += f":end_sample={end}"
+
+        run_ffmpeg(
+            [
+                "-y",
+                "-i", input_path,
+                "-vn",
+                "-af", f"aresample={sample_rate},atrim={trim},asetpts=PTS-STARTPTS",
+                "-acodec", "libmp3lame",
+                "-reservoir", "0",
+                "-f", "mp3",
+                output_path,
+            ],
+            on_progress=on_progress,
+        )
@@ -0,0 +1,116 @@
+import asyncio
+import socket
+import threading
+from collections import defaultdict
+from time import sleep
+from uuid import uuid4
+from kombu import Connection, Exchange, Queue
+from app.core.logging import get_logger
+from app.database.models.conversion_jobs import ConversionJob
+from app.schemas.conversion_jobs import ConversionJobRead
+from app.workers.celery_app import celery_app
+
+logger = get_logger(__name__)
+
+# Every API process binds its own queue, so each one sees every event
+JOB_EVENTS_EXCHANGE = Exchange("job_events", type="fanout", durable=False)
+
+RECONNECT_DELAY_SECONDS = 3
+
+
+def publish_job_event(job: ConversionJob) -> None:
+    """
+    Broadcasts the job's current state to API processes streaming it to clients.
+    """
+    publish_event(ConversionJobRead.model_validate(job).model_dump(mode="json"))
+
+
+def publish_event(payload: dict) -> None:
+    """
+    Publishes a job event payload. Best effort: a lost event must never
+    fail the conversion.
+    """
+    try:
+        with celery_app.producer_or_acquire() as producer:
+            producer.publish(
+                payload,
+                exchange=JOB_EVENTS_EXCHANGE,
+                routing_key="",
+                declare=[JOB_EVENTS_EXCHANGE],
+                serializer="json",
+                retry=True,
+                retry_policy={"max_retries": 1},
+            )
+    except Exception as e:
+        logger.warning(f"Failed to publish event for job {payload.get('id')}: {e}")
+
+
+class JobEventHub:
+    """
+    Consumes job events from the broker on a background thread and hands
+    them to the asyncio queues of clients watching that job.
+    """
+    def __init__(self, broker_url: str):
+        self.broker_url = broker_url
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(
+            target=self._consume_forever,
+            name="job-events",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers[job_id].add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            queues = self._subscribers.get(job_id)
+            if queues is None:
+                return
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[job_id]
+
+    def _consume_forever(self) -> None:
+        queue = Queue(
+            f"job_events.{uuid4()}",
+            exchange=JOB_EVENTS_EXCHANGE,
+            exclusive=True,
+            auto_delete=True,
+            durable=False,
+        )
+        while not self._stopping.is_set():
+            try:
+                with Connection(self.broker_url) as conn:
+                    with conn.Consumer(queue, callbacks=[self._dispatch], accept=["json"], no_ack=True):
+                        while not self._stopping.is_set():
+                            try:
+                                conn.drain_events(timeout=1)
+                            except socket.timeout:
+                                conn.heartbeat_check()
+            except Exception as e:
+                logger.warning(f"Job event consumer disconnected: {e}")
+                sleep(RECONNECT_DELAY_SECONDS)
+
+    def _dispatch(self, body: dict, message) -> None:
+        with self._lock:
+            queues = tuple(self._subscribers.get(body.get("id"), ()))
+
+        for queue in queues:
+            self._loop.call_soon_threadsafe(queue.put_nowait, body)
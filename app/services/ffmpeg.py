@@ -0,0 +1,123 @@
+import os
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, IO
+from app.domain.exceptions import ConversionFailedException, FfmpegKilledException
+
+STDERR_TAIL_LINES = 50
+
+
+class FfmpegProcess:
+    """
+    Runs ffmpeg with its -progress output on a dedicated pipe, so progress is
+    available even when stdout carries the audio. Progress blocks are parsed
+    as they arrive and only the last lines of stderr are kept for errors.
+    """
+    def __init__(
+        self,
+        args: list[str],
+        on_progress: Callable[[dict[str, str]], None] | None = None,
+        stdin: int | None = None,
+        stdout: int | None = None,
+    ):
+        progress_read, progress_write = os.pipe()
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-progress", f"pipe:{progress_write}",
+            *args,
+        ]
+
+        try:
+            self.process = subprocess.Popen(
+                cmd,
+                stdin=stdin if stdin is not None else subprocess.DEVNULL,
+                stdout=stdout if stdout is not None else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                pass_fds=(progress_write,),
+            )
+        except OSError:
+            os.close(progress_read)
+            raise
+        finally:
+            os.close(progress_write)
+
+        self.on_progress = on_progress
+        self.stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+
+        self._readers = [
+            threading.Thread(
+                target=self._read_progress,
+                args=(os.fdopen(progress_read, "rb"),),
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._read_stderr,
+                daemon=True,
+            ),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    @property
+    def stdin(self) -> IO[bytes]:
+        return self.process.stdin
+
+    @property
+    def stdout(self) -> IO[bytes]:
+        return self.process.stdout
+
+    def kill(self) -> None:
+        self.process.kill()
+
+    def wait(self) -> int:
+        returncode = self.process.wait()
+        for reader in self._readers:
+            reader.join()
+        return returncode
+
+    def check(self) -> None:
+        """
+        Waits for ffmpeg and raises ConversionFailedException if it failed.
+        """
+        returncode = self.wait()
+        if returncode != 0:
+            raise self.failure(returncode)
+
+    def failure(self, returncode: int) -> ConversionFailedException:
+        """
+        Exception for a non-zero exit. A negative code means ffmpeg was
+        killed by a signal rather than rejecting its input.
+        """
+        if returncode < 0:
+            return FfmpegKilledException(f"ffmpeg was killed by signal {-returncode}")
+        return ConversionFailedException(f"ffmpeg failed: {self.error_output()}")
+
+    def error_output(self) -> str:
+        return "".join(self.stderr_tail).strip()
+
+    def _read_progress(self, pipe: IO[bytes]) -> None:
+        # Blocks of key=value lines, each terminated by progress=continue|end
+        block: dict[str, str] = {}
+        with pipe:
+            for line in pipe:
+                key, _, value = line.decode(errors="replace").strip().partition("=")
+                block[key] = value
+                if key == "progress":
+                    if self.on_progress:
+                        self.on_progress(block)
+                    block = {}
+
+    def _read_stderr(self) -> None:
+        with self.process.stderr:
+            for line in self.process.stderr:
+                self.stderr_tail.append(line.decode(errors="replace"))
+
+
+def run_ffmpeg(
+    args: list[str],
+    on_progress: Callable[[dict[str, str]], None] | None = None,
+) -> None:
+    FfmpegProcess(args, on_progress=on_progress).check()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import time
+from typing import Callable
+from uuid import UUID
+from app.core.config import settings
+
+
+class InputCache:
+    """
+    Worker-local copies of downloaded inputs, keyed by job, so a retry on the
+    same worker doesn't download the input again. Entries are discarded when
+    the job finishes; the ones left behind by jobs retried on another worker
+    are pruned by age.
+    """
+    def __init__(self, directory: str | None = None, max_age: int | None = None):
+        self.directory = (
+            directory
+            or settings.CONVERSION_INPUT_CACHE_DIR
+            or os.path.join(tempfile.gettempdir(), "video-to-mp3-inputs")
+        )
+        self.max_age = max_age or settings.CONVERSION_INPUT_CACHE_MAX_AGE_SECONDS
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, job_id: UUID) -> str:
+        return os.path.join(self.directory, str(job_id))
+
+    def get(self, job_id: UUID, size: int | None = None) -> str | None:
+        """
+        Path of the cached input, if there is a complete one
+        """
+        path = self._path(job_id)
+        try:
+            cached_size = os.path.getsize(path)
+        except FileNotFoundError:
+            return None
+
+        if size is not None and cached_size != size:
+            self.discard(job_id)
+            return None
+        return path
+
+    def fill(self, job_id: UUID, download: Callable[[str], None]) -> str:
+        """
+        Downloads the input with download(path) and caches it. Interrupted
+        downloads are never visible to get.
+        """
+        self.prune()
+        path = self._path(job_id)
+        partial = f"{path}.part"
+        try:
+            download(partial)
+            os.replace(partial, path)
+        except BaseException:
+            self._remove(partial)
+            raise
+        return path
+
+    def discard(self, job_id: UUID) -> None:
+        self._remove(self._path(job_id))
+
+    def prune(self) -> None:
+        cutoff = time.time() - self.max_age
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
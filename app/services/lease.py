@@ -0,0 +1,71 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database.models.conversion_jobs import ConversionJob, JobStatus
+
+logger = get_logger(__name__)
+
+def worker_id() -> str:
+    # Not cached at import, prefork children would all get the parent's pid
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+class LeaseHeartbeat:
+    """
+    Keeps extending a claimed job's lease from a background thread while the
+    worker converts it, so only a dead worker's lease ever runs out.
+
+    Renewals go through their own short-lived sessions, like progress updates.
+    """
+    def __init__(self, job_id: UUID, bind: Engine, owner: str | None = None):
+        self.job_id = job_id
+        self.bind = bind
+        self.owner = owner or worker_id()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        interval = settings.JOB_LEASE_SECONDS / 3
+        while not self._stop.wait(interval):
+            self.renew()
+
+    def renew(self) -> None:
+        try:
+            with Session(self.bind) as session:
+                renewed = session.execute(
+                    update(ConversionJob)
+                    .where(
+                        ConversionJob.id == self.job_id,
+                        ConversionJob.status == JobStatus.PROCESSING,
+                        ConversionJob.worker_id == self.owner,
+                    )
+                    # Renewals are invisible to clients, keep updated_at so
+                    # status polls don't return the job every time
+                    .values(lease_expires_at=lease_expiry(), updated_at=ConversionJob.updated_at)
+                ).rowcount
+                session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to renew lease of job {self.job_id}: {e}")
+            return
+
+        if not renewed:
+            logger.warning(f"Lost the lease of job {self.job_id}")
@@ -0,0 +1,188 @@
+import errno
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import BinaryIO, IO
+from app.core.metrics import STORAGE_BYTES
+from app.services.storage import StorageService, ObjectStat, observed
+from app.domain.exceptions import (
+    StorageError,
+    ObjectNotFoundError,
+    StoragePermissionError,
+    StorageUnavailableError,
+)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class LocalFileStream:
+    """
+    Reads an object file, optionally limited to a byte range. Mirrors the
+    parts of the urllib3 response API that callers of download_file use.
+    """
+    def __init__(self, file: BinaryIO, offset: int, length: int):
+        self.file = file
+        self.file.seek(offset)
+        available = max(os.fstat(file.fileno()).st_size - offset, 0)
+        self.remaining = min(length, available) if length else available
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        chunk = self.file.read(size)
+        self.remaining -= len(chunk)
+        return chunk
+
+    def stream(self, chunk_size: int):
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+    def close(self) -> None:
+        self.file.close()
+
+    def release_conn(self) -> None:
+        pass
+
+
+class LocalStorageService(StorageService):
+    """
+    Keeps objects as files under a directory, for single-node deployments
+    where the API and workers share a volume. Workers hand the files to
+    ffmpeg by path and the API serves downloads straight from disk, so no
+    bytes go through an object store.
+
+    There are no presigned URLs: downloads are always proxied and direct
+    (presigned) uploads are unavailable.
+    """
+    supports_presigned_urls = False
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+        except PermissionError as e:
+            raise StoragePermissionError(f"Cannot create storage directory {self.root}") from e
+        except OSError as e:
+            raise StorageUnavailableError(f"Storage directory unavailable: {self.root}") from e
+
+    def _path(self, object_name: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, object_name))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise StorageError(f"Invalid object name: {object_name}")
+        return path
+
+    @contextmanager
+    def _errors(self, object_name: str, action: str):
+        try:
+            yield
+        except FileNotFoundError as e:
+            raise ObjectNotFoundError(f"Object not found: {object_name}") from e
+        except PermissionError as e:
+            raise StoragePermissionError(f"Access denied for object: {object_name}") from e
+        except OSError as e:
+            raise StorageError(f"Storage error while {action} {object_name}") from e
+
+    @observed("upload")
+    def upload_file(
+        self,
+        object_name: str,
+        file: BinaryIO,
+        content_type: str,
+        length: int | None = None,
+    ) -> None:
+        path = self._path(object_name)
+        with self._errors(object_name, "uploading"):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            written = self._write(file, path)
+
+        STORAGE_BYTES.labels("upload").inc(written)
+
+    @observed("upload")
+    def upload_path(self, object_name: str, path: str, content_type: str) -> None:
+        """
+        Moves the file into place. A rename when it is on the same
+        filesystem as the storage root, a copy otherwise.
+        """
+        destination = self._path(object_name)
+        with self._errors(object_name, "uploading"):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            try:
+                self._publish(path, destination)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                with open(path, "rb") as f:
+                    self._write(f, destination)
+
+        STORAGE_BYTES.labels("upload").inc(os.path.getsize(destination))
+
+    def _write(self, file: BinaryIO, destination: str) -> int:
+        """
+        Writes to a temporary file next to the object and renames it into
+        place, so readers never see a partial object. Returns the size.
+        """
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(destination), delete=False) as tmp:
+            try:
+                shutil.copyfileobj(file, tmp, COPY_CHUNK_SIZE)
+                written = tmp.tell()
+            except BaseException:
+                os.remove(tmp.name)
+                raise
+        self._publish(tmp.name, destination)
+        return written
+
+    @staticmethod
+    def _publish(source: str, destination: str) -> None:
+        # Temporary files are created owner-only, the API and workers may
+        # run as different users
+        os.chmod(source, 0o644)
+        os.replace(source, destination)
+
+    @observed("stat")
+    def stat_file(self, object_name: str) -> ObjectStat:
+        with self._errors(object_name, "reading metadata of"):
+            stat = os.stat(self._path(object_name))
+        return ObjectStat(size=stat.st_size, etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+
+    @observed("download")
+    def download_file(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+    ) -> IO[bytes]:
+        with self._errors(object_name, "downloading"):
+            stream = LocalFileStream(open(self._path(object_name), "rb"), offset, length)
+        STORAGE_BYTES.labels("download").inc(stream.remaining)
+        return stream
+
+    @observed("delete")
+    def delete_file(self, object_name: str) -> None:
+        try:
+            with self._errors(object_name, "deleting"):
+                os.remove(self._path(object_name))
+        except ObjectNotFoundError:
+            # Deleting a missing object is not an error on S3 either
+            pass
+
+    def local_path(self, object_name: str) -> str | None:
+        path = self._path(object_name)
+        return path if os.path.isfile(path) else None
+
+    def get_presigned_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(minutes=15),
+        public: bool = False,
+        response_headers: dict[str, str] | None = None,
+    ) -> str:
+        raise StorageError("The local storage backend has no presigned URLs")
+
+    def get_presigned_upload_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(hours=1),
+    ) -> str:
+        raise StorageError("The local storage backend has no presigned URLs")
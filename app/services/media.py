@@ -1,17 +1,88 @@
 from app.services.storage import StorageService
+from app.services.async_storage import AsyncStorageService
 from app.database.models.conversion_jobs import ConversionJob, JobStatus
+from app.database.models.conversion_outputs import ConversionOutput
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import update, delete, tuple_, bindparam, func
+from sqlalchemy import select as sa_select
 from sqlalchemy.exc import SQLAlchemyError 
 from typing import BinaryIO
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
+import base64
+import hashlib
+import os
 from app.domain.exceptions import (
     ConversionJobNotFoundException, 
     StorageError, 
     JobNotCompletedException,
-    ConversionFailedException
+    ConversionFailedException,
+    InvalidCursorException,
+    InvalidMediaException,
+    MediaTooLargeException,
+    ProbeUnavailableException,
 )
 from app.domain.errors import ConversionError
-from app.workers.tasks import convert_video
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.conversion import ENCODE_PARAMS
+from app.services.probe import probe_media, MediaInfo
+from app.schemas.conversion_jobs import ConversionJobRead, OutputProfile
+from app.services.renditions import job_output, job_output_keys
+from app.workers.queues import CONVERT_VIDEO_TASK, conversion_queue_for
+from app.services.outbox import enqueue_task
+
+logger = get_logger(__name__)
+
+ALLOWED_VIDEO_TYPES = {
+    "video/mp4",
+    "video/webm",
+    "video/x-matroska",
+    # more types can be added here later
+}
+
+
+# Fields a job listing can be narrowed down to
+JOB_LIST_FIELDS = tuple(ConversionJobRead.model_fields)
+
+
+def encode_job_cursor(created_at: datetime, job_id: UUID) -> str:
+    """
+    Opaque cursor pointing just past the given job in a newest-first listing
+    """
+    raw = f"{created_at.isoformat()}|{job_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_job_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, job_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(job_id)
+    except ValueError:
+        raise InvalidCursorException
+
+
+class HashingReader:
+    """
+    File wrapper that hashes the bytes as they are read, so the content hash
+    is known once the upload finishes without a second pass over the file.
+    """
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.bytes_read = 0
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file.read(size)
+        self._hash.update(chunk)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
 
 class MediaService:
     def __init__(self, storage: StorageService, db: Session):
@@ -24,25 +95,26 @@ class MediaService:
         file: BinaryIO,
         filename: str,
         content_type: str,
+        size: int | None = None,
+        profiles: list[OutputProfile] | None = None,
     ) -> ConversionJob:
         """
         Uploads a video to object storage and creates a conversion job row
         """
 
-        ALLOWED_VIDEO_TYPES = {
-            "video/mp4",
-            "video/webm",
-            "video/x-matroska",
-            # more types can be added here later
-        }
-
         if content_type not in ALLOWED_VIDEO_TYPES:
             raise ConversionFailedException("Unsupported video format")
+        # Nothing is stored for oversized files whose length the client sent
+        if size is not None:
+            self._check_size(size)
 
         input_key = f"videos/{user_id}/{filename}"
+        # PENDING only once queued, the reaper would re-enqueue a long upload
         job = ConversionJob(
             user_id=user_id,
             input_key=input_key,
+            status=JobStatus.UPLOADING,
+            renditions=self._renditions(profiles),
         )
 
         try:
@@ -55,10 +127,12 @@ class MediaService:
 
         try:
             file.seek(0)
+            hashed_file = HashingReader(file)
             self.storage.upload_file(
                 object_name=input_key,
-                file=file,
+                file=hashed_file,
                 content_type=content_type,
+                length=size,
             )
         except StorageError as e:
             job.status = JobStatus.FAILED
@@ -66,9 +140,211 @@ class MediaService:
             self.db.commit()
             raise
 
-        convert_video.delay(str(job.id))
+        job.input_hash = hashed_file.hexdigest()
+        job.input_size = hashed_file.bytes_read
+
+        # Same content was already converted, point the job at that output.
+        # Only plain MP3 outputs are shared.
+        output = None if job.renditions else self._acquire_cached_output(job.input_hash)
+        if output:
+            job.output_id = output.id
+            job.output_key = output.output_key
+            job.status = JobStatus.DONE
+            self.db.commit()
+            return job
+
+        self._validate_input(job)
+        self._enqueue(job, size=job.input_size, duration=job.duration_seconds)
+
+        return job
+
+    def create_upload(
+        self,
+        user_id: int,
+        filename: str,
+        content_type: str,
+        profiles: list[OutputProfile] | None = None,
+    ) -> tuple[ConversionJob, str, datetime]:
+        """
+        Creates a job waiting for a direct upload and returns it together with
+        a presigned PUT URL for the client and the URL's expiry time
+        """
+
+        if content_type not in ALLOWED_VIDEO_TYPES:
+            raise ConversionFailedException("Unsupported video format")
+
+        job = ConversionJob(
+            user_id=user_id,
+            input_key="",
+            status=JobStatus.UPLOADING,
+            renditions=self._renditions(profiles),
+        )
+        # Scoped by job id so concurrent uploads of the same filename don't collide
+        job.input_key = f"videos/{user_id}/{job.id}/{os.path.basename(filename)}"
+
+        expires = timedelta(minutes=settings.STORAGE_PRESIGNED_UPLOAD_EXPIRE_MINUTES)
+        upload_url = self.storage.get_presigned_upload_url(job.input_key, expires)
+
+        try:
+            self.db.add(job)
+            self.db.commit()
+            self.db.refresh(job)
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+
+        return job, upload_url, datetime.now(timezone.utc) + expires
+
+    def complete_upload(self, job_id: UUID, user_id: int) -> ConversionJob:
+        """
+        Verifies that the direct upload landed in storage and queues the job.
+        Calling it again for an already queued job is a no-op, and of
+        concurrent calls only one queues it.
+        """
+        job = self.get_status(job_id, user_id)
+
+        if job.status != JobStatus.UPLOADING:
+            return job
+
+        # Raises ObjectNotFoundError if the client never uploaded
+        stat = self.storage.stat_file(job.input_key)
+        if stat.size == 0:
+            raise ConversionFailedException("Uploaded file is empty")
+
+        # Locks the row until the job is queued or rejected. A concurrent
+        # call waits for the lock, then no longer finds the job UPLOADING.
+        claimed_id = self.db.execute(
+            update(ConversionJob)
+            .where(
+                ConversionJob.id == job.id,
+                ConversionJob.status == JobStatus.UPLOADING,
+            )
+            .values(input_size=stat.size)
+            .returning(ConversionJob.id)
+        ).scalar_one_or_none()
+
+        if claimed_id is None:
+            self.db.rollback()
+            self.db.refresh(job)
+            return job
+
+        try:
+            job.input_size = stat.size
+            self._validate_input(job)
+            self._enqueue(job, size=job.input_size, duration=job.duration_seconds)
+        except BaseException:
+            self.db.rollback()
+            raise
 
         return job
+
+    def _validate_input(self, job: ConversionJob) -> None:
+        """
+        Rejects inputs a worker could never convert before they take a queue
+        slot, and records the probed metadata on the job. ffprobe only reads
+        the container header, over ranged GETs of a presigned URL or from the
+        local file. Rejected jobs are failed and their input deleted.
+
+        Inputs that could not be probed are queued as they are, the worker
+        probes them again and ffmpeg has the final say.
+        """
+        try:
+            self._check_size(job.input_size)
+            if not settings.UPLOAD_PROBE_ENABLED:
+                return
+
+            media_info = self._probe(job.input_key)
+            if media_info is None:
+                return
+            if media_info.audio_codec is None:
+                raise InvalidMediaException(
+                    ConversionError.NO_AUDIO_STREAM.value,
+                    "The video has no audio track",
+                )
+
+            max_duration = settings.UPLOAD_MAX_DURATION_SECONDS
+            if max_duration and media_info.duration and media_info.duration > max_duration:
+                raise InvalidMediaException(
+                    ConversionError.INPUT_TOO_LONG.value,
+                    f"Videos can be at most {max_duration // 60} minutes long",
+                )
+
+        except InvalidMediaException as e:
+            self._reject(job, e.error)
+            raise
+
+        job.duration_seconds = media_info.duration
+        job.media_info = media_info.model_dump()
+
+    @staticmethod
+    def _check_size(size: int) -> None:
+        max_bytes = settings.UPLOAD_MAX_BYTES
+        if max_bytes and size > max_bytes:
+            raise MediaTooLargeException(
+                ConversionError.INPUT_TOO_LARGE.value,
+                f"Videos can be at most {max_bytes // (1024 * 1024)} MiB",
+            )
+
+    def _probe(self, input_key: str) -> MediaInfo | None:
+        try:
+            source = self.storage.local_path(input_key) or self.storage.get_presigned_url(input_key)
+            return probe_media(source)
+        except (ProbeUnavailableException, StorageError) as e:
+            # No ffprobe on this host, storage unreachable, ...: not the input's fault
+            logger.warning(f"Could not probe {input_key}, queueing it unprobed: {e}")
+            return None
+        except ConversionFailedException as e:
+            logger.info(f"Rejecting {input_key}: {e}")
+            raise InvalidMediaException(
+                ConversionError.UNSUPPORTED_FORMAT.value,
+                "The file is corrupt or not a supported video format",
+            ) from e
+
+    def _reject(self, job: ConversionJob, error: str) -> None:
+        job.status = JobStatus.FAILED
+        job.error = error
+        self.db.commit()
+
+        try:
+            self.storage.delete_file(job.input_key)
+        except StorageError as e:
+            logger.warning(f"Failed to delete rejected input {job.input_key}: {e}")
+
+    @staticmethod
+    def _renditions(profiles: list[OutputProfile] | None) -> list[dict] | None:
+        if not profiles:
+            return None
+        return [profile.model_dump(mode="json") for profile in profiles]
+
+    def _enqueue(self, job: ConversionJob, size: int | None, duration: float | None = None) -> None:
+        """
+        Commits the job together with its task for the conversion queue of its size class
+        """
+        job.status = JobStatus.PENDING
+        job.queue = conversion_queue_for(size, duration)
+        job.queued_at = datetime.now(timezone.utc)
+        # Published by the outbox relay once this commits, so a slow or
+        # unreachable broker neither delays the request nor loses the job
+        enqueue_task(self.db, CONVERT_VIDEO_TASK, [str(job.id)], job.queue)
+        self.db.commit()
+
+    def _acquire_cached_output(self, input_hash: str):
+        """
+        Takes a reference on a cached output for the given content, if any.
+        Outputs whose count already dropped to zero are being deleted and
+        are treated as a miss.
+        """
+        query = (
+            update(ConversionOutput)
+            .where(
+                ConversionOutput.input_hash == input_hash,
+                ConversionOutput.encode_params == ENCODE_PARAMS,
+                ConversionOutput.ref_count > 0,
+            )
+            .values(ref_count=ConversionOutput.ref_count + 1)
+            .returning(ConversionOutput.id, ConversionOutput.output_key)
+        )
+        return self.db.execute(query).first()
         
     def get_status(
         self,
@@ -90,10 +366,207 @@ class MediaService:
 
         return job
     
-    def download_mp3(self, job_id: UUID, user_id: int):
+    def get_finished_job(self, job_id: UUID, user_id: int) -> ConversionJob:
+        """
+        Fetch a job owned by the given user whose MP3 is ready
+        """
         job = self.get_status(job_id, user_id)
 
         if job.status != JobStatus.DONE:
             raise JobNotCompletedException
 
-        return self.storage.download_file(job.output_key)
+        return job
+
+    def get_mp3_url(self, job_id: UUID, user_id: int, rendition: str | None = None) -> str:
+        """
+        Returns a short-lived URL the client can stream the MP3 (or the given
+        rendition) from directly
+        """
+        job = self.get_finished_job(job_id, user_id)
+        key, content_type, extension = job_output(job, rendition)
+        return self.storage.get_presigned_url(
+            key,
+            expires=timedelta(minutes=settings.STORAGE_PRESIGNED_DOWNLOAD_EXPIRE_MINUTES),
+            public=True,
+            response_headers={
+                "response-content-type": content_type,
+                "response-content-disposition": f'attachment; filename="{job_id}.{extension}"',
+            },
+        )
+
+    def delete_job(self, job_id: UUID, user_id: int) -> None:
+        """
+        Deletes a finished job. Its MP3 is removed from storage only when no
+        other job shares it; renditions are never shared.
+        """
+        job = self.get_status(job_id, user_id)
+
+        if job.status in (JobStatus.PENDING, JobStatus.PROCESSING):
+            raise JobNotCompletedException
+
+        orphaned_keys = job_output_keys(job)
+        output_id = job.output_id
+
+        try:
+            self.db.delete(job)
+            self.db.flush()
+
+            if output_id:
+                remaining = self.db.execute(
+                    update(ConversionOutput)
+                    .where(ConversionOutput.id == output_id)
+                    .values(ref_count=ConversionOutput.ref_count - 1)
+                    .returning(ConversionOutput.ref_count)
+                ).scalar_one()
+
+                if remaining > 0:
+                    orphaned_keys = []
+                else:
+                    self.db.execute(
+                        delete(ConversionOutput).where(ConversionOutput.id == output_id)
+                    )
+
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+
+        for key in orphaned_keys:
+            try:
+                self.storage.delete_file(key)
+            except StorageError as e:
+                logger.warning(f"Failed to delete {key}: {e}")
+
+
+class AsyncMediaService:
+    """
+    Read paths of MediaService on an async session, for the request handlers
+    that poll job state (status, events, download).
+    """
+    def __init__(self, storage: AsyncStorageService, db: AsyncSession):
+        self.storage = storage
+        self.db = db
+
+    async def get_status(self, job_id: UUID, user_id: int) -> ConversionJob:
+        """
+        Fetch a conversion job status owned by the given user
+        """
+        query = select(ConversionJob).where(
+            ConversionJob.id == job_id,
+            ConversionJob.user_id == user_id,
+        )
+        job = (await self.db.exec(query)).first()
+
+        if job is None:
+            raise ConversionJobNotFoundException
+
+        return job
+
+    async def get_statuses(
+        self,
+        job_ids: list[UUID],
+        user_id: int,
+        since: datetime | None = None,
+    ) -> tuple[list[ConversionJob], datetime]:
+        """
+        Fetch the given jobs owned by the user in a single query, optionally
+        only those updated after `since`. Unknown ids are skipped.
+
+        Also returns the `since` of the next poll. It comes from the DB clock,
+        not this host's, and lags it by JOB_STATUS_POLL_OVERLAP_SECONDS:
+        updated_at is stamped by the workers' clocks and a job may commit
+        with an updated_at just before now. Polls overlap a little instead
+        of missing those.
+        """
+        db_now = (await self.db.exec(sa_select(func.now()))).scalar_one()
+        as_of = db_now.replace(tzinfo=db_now.tzinfo or timezone.utc) - timedelta(
+            seconds=settings.JOB_STATUS_POLL_OVERLAP_SECONDS
+        )
+
+        # An expanding parameter is rendered per execution, so the compiled
+        # statement is cached once whatever the batch size
+        query = select(ConversionJob).where(
+            ConversionJob.id.in_(bindparam("job_ids", job_ids, expanding=True)),
+            ConversionJob.user_id == user_id,
+        )
+        if since is not None:
+            # updated_at is stored as naive UTC
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            query = query.where(ConversionJob.updated_at > since)
+
+        return list((await self.db.exec(query)).all()), as_of
+
+    async def list_jobs(
+        self,
+        user_id: int,
+        limit: int,
+        cursor: str | None = None,
+        status: JobStatus | None = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        One page of the user's jobs, newest first, and the cursor of the next
+        page (None on the last one).
+
+        Pages are keyset-paginated on (created_at, id) so every page is a range
+        scan of ix_conversion_jobs_user_id_created_at_id, however deep it is.
+        Only the requested columns are read.
+        """
+        fields = list(fields or JOB_LIST_FIELDS)
+        columns = dict.fromkeys([*fields, "created_at", "id"])
+
+        query = (
+            sa_select(*(getattr(ConversionJob, name) for name in columns))
+            .where(ConversionJob.user_id == user_id)
+        )
+        if status is not None:
+            query = query.where(ConversionJob.status == status)
+        if cursor:
+            created_at, job_id = decode_job_cursor(cursor)
+            query = query.where(
+                tuple_(ConversionJob.created_at, ConversionJob.id) < tuple_(created_at, job_id)
+            )
+
+        # One extra row tells whether there is a next page
+        query = query.order_by(
+            ConversionJob.created_at.desc(),
+            ConversionJob.id.desc(),
+        ).limit(limit + 1)
+
+        rows = (await self.db.execute(query)).mappings().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_job_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        return [{name: row[name] for name in fields} for row in rows], next_cursor
+
+    async def get_finished_job(self, job_id: UUID, user_id: int) -> ConversionJob:
+        """
+        Fetch a job owned by the given user whose MP3 is ready
+        """
+        job = await self.get_status(job_id, user_id)
+
+        if job.status != JobStatus.DONE:
+            raise JobNotCompletedException
+
+        return job
+
+    async def get_mp3_url(self, job_id: UUID, user_id: int, rendition: str | None = None) -> str:
+        """
+        Returns a short-lived URL the client can stream the MP3 (or the given
+        rendition) from directly
+        """
+        job = await self.get_finished_job(job_id, user_id)
+        key, content_type, extension = job_output(job, rendition)
+        return self.storage.get_presigned_url(
+            key,
+            expires=timedelta(minutes=settings.STORAGE_PRESIGNED_DOWNLOAD_EXPIRE_MINUTES),
+            public=True,
+            response_headers={
+                "response-content-type": content_type,
+                "response-content-disposition": f'attachment; filename="{job_id}.{extension}"',
+            },
+        )
@@ -0,0 +1,380 @@
+import mmap
+from app.domain.exceptions import ConversionFailedException
+
+# MPEG audio layer III frame headers
+MPEG_1 = 3
+MPEG_2 = 2
+MPEG_2_5 = 0
+LAYER_3 = 1
+MONO = 3
+BITRATES = {
+    MPEG_1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    MPEG_2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {
+    MPEG_1: (44100, 48000, 32000),
+    MPEG_2: (22050, 24000, 16000),
+    MPEG_2_5: (11025, 12000, 8000),
+}
+
+# Xing/Info header written by ffmpeg into the first frame, followed by the
+# LAME tag that carries the encoder delay and padding used for gapless playback
+XING_TAGS = (b"Xing", b"Info")
+XING_FRAMES = 0x1
+XING_BYTES = 0x2
+XING_TOC = 0x4
+XING_VBR_SCALE = 0x8
+XING_TOC_SIZE = 100
+LAME_TAG_SIZE = 36
+LAME_DELAY_OFFSET = 21
+LAME_MUSIC_LENGTH_OFFSET = 28
+LAME_MUSIC_CRC_OFFSET = 32
+LAME_TAG_CRC_OFFSET = 34
+LAME_TAG_CRC_LENGTH = 190
+
+# CRC-16 of the LAME tag (polynomial 0x8005, reflected)
+CRC16_POLY = 0xA001
+CRC16_ORDER = 32767
+
+
+def _crc16_table() -> list[int]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ CRC16_POLY if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC16_TABLE = _crc16_table()
+
+
+def crc16(data: bytes, crc: int = 0) -> int:
+    for byte in data:
+        crc = CRC16_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc
+
+
+def _multmodp(a: int, b: int) -> int:
+    # a * b modulo the CRC polynomial, in the reflected bit order of the CRC
+    m = 1 << 15
+    p = 0
+    while True:
+        if a & m:
+            p ^= b
+            if a & (m - 1) == 0:
+                return p
+        m >>= 1
+        b = (b >> 1) ^ CRC16_POLY if b & 1 else b >> 1
+
+
+def _shift(crc: int, length: int) -> int:
+    """
+    The CRC of a message after appending `length` zero bytes. Negative
+    lengths undo that, the multiplicative order of x modulo the polynomial
+    being 2^15 - 1.
+    """
+    exponent = (8 * length) % CRC16_ORDER
+    power = 1 << 15
+    square = 1 << 14
+    while exponent:
+        if exponent & 1:
+            power = _multmodp(square, power)
+        square = _multmodp(square, square)
+        exponent >>= 1
+    return _multmodp(power, crc)
+
+
+def crc16_combine(crc1: int, crc2: int, length2: int) -> int:
+    """CRC of A + B from the CRCs of A and B and the length of B."""
+    return _shift(crc1, length2) ^ crc2
+
+
+def encoder_sample_rate(sample_rate: int) -> int:
+    """
+    The rate libmp3lame encodes audio of the given rate at, the closest one
+    MP3 supports, as ffmpeg picks it.
+    """
+    rates = [rate for version in (MPEG_1, MPEG_2, MPEG_2_5) for rate in SAMPLE_RATES[version]]
+    return min(rates, key=lambda rate: abs(rate - sample_rate))
+
+
+def frame_samples(sample_rate: int) -> int:
+    # MPEG-2 and 2.5 (the low sample rates) have half-length frames
+    return 1152 if sample_rate in SAMPLE_RATES[MPEG_1] else 576
+
+
+class Mp3Frame:
+    __slots__ = ("offset", "size")
+
+    def __init__(self, offset: int, size: int):
+        self.offset = offset
+        self.size = size
+
+
+class Mp3File:
+    """
+    The frames of an MP3 file written by ffmpeg's libmp3lame encoder, with
+    the encoder delay and padding from its LAME tag.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file
+                self.data = b""
+
+        self.frames: list[Mp3Frame] = []
+        offset = self._skip_id3v2()
+        self.header = bytes(self.data[:offset])
+        while offset + 4 <= len(self.data):
+            header = _parse_header(self.data, offset)
+            if header is None:
+                raise ConversionFailedException(f"Invalid MP3 frame at byte {offset} of {path}")
+            self.frames.append(Mp3Frame(offset, header["size"]))
+            offset += header["size"]
+
+        if not self.frames:
+            raise ConversionFailedException(f"No MP3 frames in {path}")
+
+        first = _parse_header(self.data, self.frames[0].offset)
+        self.version = first["version"]
+        self.sample_rate = first["sample_rate"]
+        self.frame_samples = first["samples"]
+
+        info = self._parse_info()
+        if info is None:
+            raise ConversionFailedException(f"No LAME tag in {path}")
+        self.info = self.frames.pop(0)
+        self.info_fields = info
+        self.encoder_delay = info["delay"]
+        self.padding = info["padding"]
+        self.music_crc = info["music_crc"]
+
+    @property
+    def samples(self) -> int:
+        """Decoded length without the encoder delay and padding."""
+        return len(self.frames) * self.frame_samples - self.encoder_delay - self.padding
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def _skip_id3v2(self) -> int:
+        if self.data[:3] != b"ID3" or len(self.data) < 10:
+            return 0
+        size = 0
+        for byte in self.data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        return 10 + size
+
+    def _parse_info(self) -> dict | None:
+        frame = self.frames[0]
+        offset = frame.offset + _side_info_offset(self.data, frame.offset)
+        if bytes(self.data[offset:offset + 4]) not in XING_TAGS:
+            return None
+
+        fields = {"offset": offset - frame.offset}
+        flags = int.from_bytes(self.data[offset + 4:offset + 8], "big")
+        position = offset + 8
+        for flag, size in (
+            (XING_FRAMES, 4),
+            (XING_BYTES, 4),
+            (XING_TOC, XING_TOC_SIZE),
+            (XING_VBR_SCALE, 4),
+        ):
+            if flags & flag:
+                fields[flag] = position - frame.offset
+                position += size
+
+        if position + LAME_TAG_SIZE > frame.offset + frame.size:
+            return None
+        fields["lame"] = position - frame.offset
+        delay = int.from_bytes(self.data[position + LAME_DELAY_OFFSET:position + LAME_DELAY_OFFSET + 3], "big")
+        fields["delay"] = delay >> 12
+        fields["padding"] = delay & 0xFFF
+        fields["music_crc"] = int.from_bytes(
+            self.data[position + LAME_MUSIC_CRC_OFFSET:position + LAME_MUSIC_CRC_OFFSET + 2],
+            "big",
+        )
+        return fields
+
+    def frame_bytes(self, start: int, end: int) -> tuple[int, int]:
+        """Byte range of frames [start, end)."""
+        first = self.frames[start].offset
+        if end >= len(self.frames):
+            return first, len(self.data)
+        return first, self.frames[end].offset
+
+    def main_data_begin(self, index: int) -> int:
+        """How far back into earlier frames the frame's audio data starts."""
+        data = self.data
+        offset = self.frames[index].offset + _header_size(data, self.frames[index].offset)
+        if self.version == MPEG_1:
+            return (data[offset] << 1) | (data[offset + 1] >> 7)
+        return data[offset]
+
+    def block_types(self, index: int) -> tuple:
+        """
+        Window type of the frame's last granule in each channel. The next
+        granule's window has to overlap with it, which is what decides
+        where two encodes of the same audio can be joined.
+        """
+        data = self.data
+        offset = self.frames[index].offset
+        channels = 1 if data[offset + 3] >> 6 == MONO else 2
+        reader = _BitReader(data, offset + _header_size(data, offset))
+
+        if self.version == MPEG_1:
+            granules = 2
+            reader.skip(9 + (5 if channels == 1 else 3) + 4 * channels)
+            scalefac_compress = 4
+        else:
+            granules = 1
+            reader.skip(8 + (1 if channels == 1 else 2))
+            scalefac_compress = 9
+
+        types = []
+        for _ in range(granules):
+            types = []
+            for _ in range(channels):
+                reader.skip(12 + 9 + 8 + scalefac_compress)
+                if reader.read(1):
+                    types.append((reader.read(2), reader.read(1)))
+                    reader.skip(10 + 9)
+                else:
+                    types.append((0, 0))
+                    reader.skip(15 + 4 + 3)
+                reader.skip(3 if self.version == MPEG_1 else 2)
+        return tuple(types)
+
+
+class _BitReader:
+    def __init__(self, data, offset: int):
+        self.data = data
+        self.position = offset * 8
+
+    def read(self, bits: int) -> int:
+        value = 0
+        for _ in range(bits):
+            byte = self.data[self.position >> 3]
+            value = (value << 1) | ((byte >> (7 - (self.position & 7))) & 1)
+            self.position += 1
+        return value
+
+    def skip(self, bits: int) -> None:
+        self.position += bits
+
+
+def _parse_header(data, offset: int) -> dict | None:
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x3
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x3
+    if (
+        version not in SAMPLE_RATES
+        or (b1 >> 1) & 0x3 != LAYER_3
+        or bitrate_index in (0, 15)
+        or sample_rate_index == 3
+    ):
+        return None
+
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    bitrate = BITRATES[MPEG_1 if version == MPEG_1 else MPEG_2][bitrate_index] * 1000
+    samples = 1152 if version == MPEG_1 else 576
+    size = samples // 8 * bitrate // sample_rate + ((b2 >> 1) & 0x1)
+    return {
+        "version": version,
+        "sample_rate": sample_rate,
+        "samples": samples,
+        "size": size,
+    }
+
+
+def _header_size(data, offset: int) -> int:
+    # 4 bytes, plus a CRC when the protection bit is cleared
+    return 4 if data[offset + 1] & 0x1 else 6
+
+
+def _side_info_offset(data, offset: int) -> int:
+    mono = data[offset + 3] >> 6 == MONO
+    if (data[offset + 1] >> 3) & 0x3 == MPEG_1:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    return _header_size(data, offset) + side_info
+
+
+def _audio_crc(part: Mp3File, start: int, end: int) -> int:
+    """
+    CRC of the audio in frames [start, end), worked out from the CRC of the
+    whole file so only the dropped frames at either end are read.
+    """
+    audio_start = part.frames[0].offset
+    audio_end = len(part.data)
+    first, last = part.frame_bytes(start, end)
+
+    prefix = crc16(part.data[audio_start:first])
+    suffix = crc16(part.data[last:audio_end])
+    # Strip the suffix off the whole file's CRC, then the prefix off the front
+    head = _shift(part.music_crc ^ suffix, -(audio_end - last))
+    return head ^ _shift(prefix, last - first)
+
+
+def join_frames(output_path: str, parts: list[tuple[Mp3File, int, int]]) -> None:
+    """
+    Writes frames [start, end) of each part back to back, after an Info
+    frame with the LAME tag rewritten for the joined audio. The encoder delay
+    comes from the first part and the padding from the last.
+    """
+    first_part = parts[0][0]
+    last_part = parts[-1][0]
+    info = bytearray(first_part.data[first_part.info.offset:first_part.info.offset + first_part.info.size])
+    fields = first_part.info_fields
+
+    frame_count = sum(end - start for _, start, end in parts)
+    audio_size = 0
+    music_crc = 0
+    offsets = []
+    for part, start, end in parts:
+        first, last = part.frame_bytes(start, end)
+        offsets += [audio_size + frame.offset - first for frame in part.frames[start:end]]
+        music_crc = crc16_combine(music_crc, _audio_crc(part, start, end), last - first)
+        audio_size += last - first
+    total_size = len(info) + audio_size
+
+    if XING_FRAMES in fields:
+        info[fields[XING_FRAMES]:fields[XING_FRAMES] + 4] = frame_count.to_bytes(4, "big")
+    if XING_BYTES in fields:
+        info[fields[XING_BYTES]:fields[XING_BYTES] + 4] = total_size.to_bytes(4, "big")
+    if XING_TOC in fields:
+        # Where every percent of the duration starts, in 1/256ths of the audio
+        toc = bytes(
+            min(255, offsets[index * frame_count // XING_TOC_SIZE] * 256 // audio_size)
+            for index in range(XING_TOC_SIZE)
+        )
+        info[fields[XING_TOC]:fields[XING_TOC] + XING_TOC_SIZE] = toc
+
+    lame = fields["lame"]
+    delay = (first_part.encoder_delay << 12) | last_part.padding
+    info[lame + LAME_DELAY_OFFSET:lame + LAME_DELAY_OFFSET + 3] = delay.to_bytes(3, "big")
+    info[lame + LAME_MUSIC_LENGTH_OFFSET:lame + LAME_MUSIC_LENGTH_OFFSET + 4] = total_size.to_bytes(4, "big")
+    info[lame + LAME_MUSIC_CRC_OFFSET:lame + LAME_MUSIC_CRC_OFFSET + 2] = music_crc.to_bytes(2, "big")
+    # Same as ffmpeg: the tag CRC covers the first 190 bytes of the frame
+    # (less if the frame is shorter), taken with the CRC itself zeroed
+    info[lame + LAME_TAG_CRC_OFFSET:lame + LAME_TAG_CRC_OFFSET + 2] = b"\0\0"
+    tag_crc = crc16(bytes(info[:LAME_TAG_CRC_LENGTH]).ljust(LAME_TAG_CRC_LENGTH, b"\0"))
+    info[lame + LAME_TAG_CRC_OFFSET:lame + LAME_TAG_CRC_OFFSET + 2] = tag_crc.to_bytes(2, "big")
+
+    with open(output_path, "wb") as f:
+        f.write(first_part.header)
+        f.write(info)
+        for part, start, end in parts:
+            first, last = part.frame_bytes(start, end)
+            f.write(part.data[first:last])
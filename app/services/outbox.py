@@ -0,0 +1,120 @@
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update, delete
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database.models.outbox import OutboxMessage
+from app.services.queue.base import MessageQueue
+
+logger = get_logger(__name__)
+
+
+def enqueue_task(db: Session, task: str, args: list, queue: str) -> OutboxMessage:
+    """
+    Adds a task to the outbox. It is published once the caller commits,
+    together with whatever else the transaction wrote.
+    """
+    message = OutboxMessage(task=task, args=args, queue=queue)
+    db.add(message)
+    return message
+
+
+class OutboxRelay:
+    """
+    Drains the outbox to the broker in batches.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so several relays can run
+    side by side. Delivery is at-least-once: if the relay dies between
+    publishing and marking a batch, that batch is published again.
+    """
+    def __init__(
+        self,
+        queue: MessageQueue,
+        bind: Engine,
+        batch_size: int | None = None,
+        poll_interval: float | None = None,
+    ):
+        self.queue = queue
+        self.bind = bind
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+        self._running = False
+        self._last_prune = 0.0
+
+    def relay_batch(self) -> int:
+        """
+        Publishes one batch of unsent messages and returns how many were sent
+        """
+        with Session(self.bind) as db:
+            messages = db.exec(
+                select(OutboxMessage)
+                .where(OutboxMessage.sent_at.is_(None))
+                .order_by(OutboxMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+
+            if not messages:
+                return 0
+
+            self.queue.publish_batch([
+                {"task": message.task, "args": message.args, "queue": message.queue}
+                for message in messages
+            ])
+
+            db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_([message.id for message in messages]))
+                .values(sent_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+
+        return len(messages)
+
+    def prune(self) -> None:
+        """
+        Deletes messages sent longer ago than the retention period
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        with Session(self.bind) as db:
+            db.execute(
+                delete(OutboxMessage).where(OutboxMessage.sent_at < cutoff)
+            )
+            db.commit()
+
+    def run(self) -> None:
+        self._running = True
+        failures = 0
+        logger.info("Outbox relay started")
+
+        while self._running:
+            try:
+                sent = self.relay_batch()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                delay = min(self.poll_interval * 2 ** failures, 30)
+                logger.warning(f"Outbox relay failed, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                continue
+
+            # A full batch means there is probably more waiting
+            if sent < self.batch_size:
+                self._maybe_prune()
+                time.sleep(self.poll_interval)
+
+        logger.info("Outbox relay stopped")
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _maybe_prune(self) -> None:
+        if time.monotonic() - self._last_prune < 3600:
+            return
+        self._last_prune = time.monotonic()
+        try:
+            self.prune()
+        except Exception as e:
+            logger.warning(f"Outbox prune failed: {e}")
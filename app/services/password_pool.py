@@ -0,0 +1,44 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from app.core.config import settings
+from app.core.security import hash_password, verify_and_update_password
+from app.domain.exceptions import PasswordHashingBusyException
+
+
+class PasswordHashingPool:
+    """
+    Runs Argon2 hashing in a small dedicated process pool, so a burst of
+    logins can't saturate the API threadpool or the event loop.
+
+    At most max_pending operations are queued or running at once; beyond
+    that callers get PasswordHashingBusyException instead of waiting.
+    """
+    def __init__(self, workers: int | None = None, max_pending: int | None = None):
+        self.max_pending = max_pending or settings.PASSWORD_HASH_MAX_PENDING
+        # spawn, not fork: the API process already runs threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers or settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._pending = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._submit(verify_and_update_password, password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, func, *args):
+        # Only touched from the event loop thread, no lock needed
+        if self._pending >= self.max_pending:
+            raise PasswordHashingBusyException()
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
@@ -0,0 +1,83 @@
+import json
+import subprocess
+from pydantic import BaseModel
+from app.domain.exceptions import ConversionFailedException, ProbeUnavailableException
+
+PROBE_TIMEOUT_SECONDS = 30
+
+# ffprobe errors that mean the input itself is not readable media
+INPUT_ERRORS = (
+    "Invalid data found when processing input",
+    "moov atom not found",
+)
+
+
+class MediaInfo(BaseModel):
+    format_name: str | None = None
+    duration: float | None = None
+    bit_rate: int | None = None
+    audio_codec: str | None = None
+    video_codec: str | None = None
+    sample_rate: int | None = None
+
+
+def probe_media(source: str) -> MediaInfo:
+    """
+    Inspects a media file with ffprobe. The source can be a local path or a
+    URL; over HTTP ffprobe only reads the parts of the file it needs.
+
+    Raises ConversionFailedException when ffprobe rejects the input and
+    ProbeUnavailableException when it failed for any other reason.
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        source,
+    ]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=PROBE_TIMEOUT_SECONDS,
+        )
+    except subprocess.TimeoutExpired as e:
+        raise ProbeUnavailableException("ffprobe timed out") from e
+    except OSError as e:
+        raise ProbeUnavailableException(f"Could not run ffprobe: {e}") from e
+
+    if result.returncode != 0:
+        error = result.stderr.strip()
+        if any(marker in error for marker in INPUT_ERRORS):
+            raise ConversionFailedException(f"ffprobe failed: {error}")
+        # Unreachable URL, I/O error, ...
+        raise ProbeUnavailableException(f"ffprobe failed: {error}")
+
+    try:
+        data = json.loads(result.stdout or "{}")
+    except ValueError as e:
+        raise ProbeUnavailableException("ffprobe printed invalid JSON") from e
+    fmt = data.get("format", {})
+    streams = data.get("streams", [])
+
+    def first_stream(codec_type: str) -> dict:
+        for stream in streams:
+            if stream.get("codec_type") == codec_type:
+                return stream
+        return {}
+
+    audio = first_stream("audio")
+
+    return MediaInfo(
+        format_name=fmt.get("format_name"),
+        duration=float(fmt["duration"]) if fmt.get("duration") else None,
+        bit_rate=int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+        audio_codec=audio.get("codec_name"),
+        video_codec=first_stream("video").get("codec_name"),
+        sample_rate=int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+    )
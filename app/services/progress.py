@@ -0,0 +1,95 @@
+import threading
+import time
+from functools import partial
+from typing import Callable
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database.models.conversion_jobs import ConversionJob, JobStatus
+from app.services.events import publish_event
+
+logger = get_logger(__name__)
+
+
+class ProgressReporter:
+    """
+    Turns ffmpeg -progress blocks into throttled progress updates on the job
+    row. Several ffmpeg processes (e.g. parallel segments) can report into
+    one reporter, their encoded time and speed are summed.
+
+    Updates are written through a separate short-lived session, since they
+    arrive on reader threads while the worker's session is in use.
+    """
+    def __init__(self, job_id: UUID, bind: Engine, duration: float | None):
+        self.job_id = job_id
+        self.bind = bind
+        self.duration = duration
+        self._encoded: dict[int, float] = {}
+        self._speeds: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._last_update = 0.0
+
+    def for_process(self, index: int = 0) -> Callable[[dict[str, str]], None]:
+        return partial(self._on_progress, index)
+
+    def _on_progress(self, index: int, block: dict[str, str]) -> None:
+        try:
+            encoded = int(block.get("out_time_us", "")) / 1_000_000
+        except ValueError:
+            # "N/A" until the first frame is written
+            return
+
+        speed = block.get("speed", "").rstrip("x").strip()
+
+        with self._lock:
+            self._encoded[index] = encoded
+            try:
+                self._speeds[index] = float(speed)
+            except ValueError:
+                pass
+
+            now = time.monotonic()
+            if now - self._last_update < settings.CONVERSION_PROGRESS_INTERVAL:
+                return
+            self._last_update = now
+
+            total_encoded = sum(self._encoded.values())
+            total_speed = sum(self._speeds.values()) or None
+
+        progress = None
+        eta_seconds = None
+        if self.duration:
+            progress = round(min(total_encoded / self.duration * 100, 100.0), 1)
+            if total_speed:
+                eta_seconds = max(int((self.duration - total_encoded) / total_speed), 0)
+
+        self._save(progress, total_speed, eta_seconds)
+
+    def _save(self, progress: float | None, speed: float | None, eta_seconds: int | None) -> None:
+        values = {
+            "progress": progress,
+            "encode_speed": speed,
+            "eta_seconds": eta_seconds,
+        }
+        try:
+            with Session(self.bind) as session:
+                session.execute(
+                    update(ConversionJob)
+                    .where(ConversionJob.id == self.job_id)
+                    # Progress reaches clients through the events stream,
+                    # status polls only return jobs whose state changed
+                    .values(**values, updated_at=ConversionJob.updated_at)
+                )
+                session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to save progress of job {self.job_id}: {e}")
+            return
+
+        publish_event({
+            "id": str(self.job_id),
+            "status": JobStatus.PROCESSING.value,
+            **values,
+        })
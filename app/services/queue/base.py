@@ -3,4 +3,12 @@ from abc import ABC, abstractmethod
 class MessageQueue(ABC):
     @abstractmethod
     def publish(self, message: dict) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    def publish_batch(self, messages: list[dict]) -> None:
+        """
+        Publishes the messages in order. Raises if any of them could not be
+        published; the ones before it may already have been.
+        """
+        for message in messages:
+            self.publish(message)
@@ -0,0 +1,24 @@
+from celery import Celery
+from app.services.queue.base import MessageQueue
+
+class CeleryQueue(MessageQueue):
+    """
+    Publishes outbox messages as Celery tasks. A message is
+    {"task": <task name>, "args": [...], "queue": <queue name>}.
+    """
+    def __init__(self, app: Celery):
+        self.app = app
+
+    def publish(self, message: dict) -> None:
+        self.publish_batch([message])
+
+    def publish_batch(self, messages: list[dict]) -> None:
+        # One connection and channel for the whole batch
+        with self.app.producer_or_acquire() as producer:
+            for message in messages:
+                self.app.send_task(
+                    message["task"],
+                    args=message["args"],
+                    queue=message["queue"],
+                    producer=producer,
+                )
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database.models.conversion_jobs import ConversionJob, JobStatus
+from app.domain.errors import ConversionError
+from app.domain.exceptions import StorageError
+from app.services.outbox import enqueue_task
+from app.services.storage import StorageService, build_storage_service
+from app.workers.queues import CONVERT_VIDEO_TASK, STANDARD_QUEUE
+
+logger = get_logger(__name__)
+
+
+class JobReaper:
+    """
+    Re-enqueues jobs no worker is going to finish: PROCESSING jobs whose
+    lease expired, and PENDING jobs whose message was lost. Both are handled
+    in bulk, together with their outbox rows, in one transaction.
+
+    A job that was only slow to be picked up gets a second message, which
+    the claim turns into a no-op.
+
+    UPLOADING jobs whose client never finished the upload are failed once
+    the upload URL expired, plus REAPER_UPLOADING_GRACE_SECONDS, and
+    whatever was stored of their input is deleted.
+    """
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int | None = None,
+        storage: StorageService | None = None,
+    ):
+        self.db = db
+        self.batch_size = batch_size or settings.REAPER_BATCH_SIZE
+        self._storage = storage
+
+    def reap(self) -> int:
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=settings.REAPER_PENDING_STALE_SECONDS)
+
+        # Back to PENDING, which also bumps updated_at so the next run
+        # doesn't treat them as stale right away
+        expired = self._update_batch(
+            (
+                ConversionJob.status == JobStatus.PROCESSING,
+                ConversionJob.lease_expires_at < now,
+            ),
+            status=JobStatus.PENDING,
+            worker_id=None,
+            lease_expires_at=None,
+        )
+        stale = self._update_batch(
+            (
+                ConversionJob.status == JobStatus.PENDING,
+                ConversionJob.updated_at < stale_before,
+            ),
+            updated_at=now,
+        )
+
+        abandoned_before = now - timedelta(
+            minutes=settings.STORAGE_PRESIGNED_UPLOAD_EXPIRE_MINUTES,
+            seconds=settings.REAPER_UPLOADING_GRACE_SECONDS,
+        )
+        abandoned = self._update_batch(
+            (
+                ConversionJob.status == JobStatus.UPLOADING,
+                ConversionJob.created_at < abandoned_before,
+            ),
+            status=JobStatus.FAILED,
+            error=ConversionError.UPLOAD_ABANDONED.value,
+        )
+
+        for job in [*expired, *stale]:
+            enqueue_task(self.db, CONVERT_VIDEO_TASK, [str(job.id)], job.queue or STANDARD_QUEUE)
+        self.db.commit()
+
+        if expired or stale:
+            logger.warning(
+                f"Re-enqueued {len(expired)} jobs with expired leases "
+                f"and {len(stale)} stale pending jobs"
+            )
+        if abandoned:
+            logger.warning(f"Failed {len(abandoned)} jobs whose upload was abandoned")
+            for job in abandoned:
+                self._delete_input(job.input_key)
+
+        return len(expired) + len(stale) + len(abandoned)
+
+    @property
+    def storage(self) -> StorageService:
+        # Only built when there is something to delete, the leases must
+        # still be reaped while storage is down
+        if self._storage is None:
+            self._storage = build_storage_service()
+        return self._storage
+
+    def _delete_input(self, input_key: str) -> None:
+        try:
+            self.storage.delete_file(input_key)
+        except StorageError as e:
+            logger.warning(f"Failed to delete abandoned upload {input_key}: {e}")
+
+    def _update_batch(self, conditions: tuple, **values) -> list:
+        # Rows another reaper is handling are skipped rather than waited for
+        batch = (
+            select(ConversionJob.id)
+            .where(*conditions)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return self.db.execute(
+            update(ConversionJob)
+            .where(ConversionJob.id.in_(batch))
+            .values(**values)
+            .returning(ConversionJob.id, ConversionJob.queue, ConversionJob.input_key)
+        ).all()
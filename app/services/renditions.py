@@ -0,0 +1,89 @@
+from uuid import UUID
+from pydantic import BaseModel
+from app.schemas.conversion_jobs import AudioCodec, OutputProfile
+from app.domain.exceptions import RenditionNotFoundException
+
+
+class CodecInfo(BaseModel):
+    encoder: str
+    format: str
+    extension: str
+    content_type: str
+
+
+CODECS = {
+    AudioCodec.MP3: CodecInfo(encoder="libmp3lame", format="mp3", extension="mp3", content_type="audio/mpeg"),
+    # ADTS rather than mp4, so the output can be written front-to-back
+    AudioCodec.AAC: CodecInfo(encoder="aac", format="adts", extension="aac", content_type="audio/aac"),
+    AudioCodec.OPUS: CodecInfo(encoder="libopus", format="ogg", extension="opus", content_type="audio/ogg"),
+}
+
+# Average bitrates (kbps) of LAME's VBR presets V0..V9
+LAME_VBR_BITRATES = (245, 225, 190, 175, 165, 130, 115, 100, 85, 65)
+
+
+def rendition_key(user_id: int, job_id: UUID, profile: OutputProfile) -> str:
+    return f"audio/{user_id}/{job_id}/{profile.name}.{CODECS[profile.codec].extension}"
+
+
+def lame_vbr_quality(bitrate: int) -> int:
+    return min(
+        range(len(LAME_VBR_BITRATES)),
+        key=lambda quality: abs(LAME_VBR_BITRATES[quality] - bitrate),
+    )
+
+
+def output_args(profile: OutputProfile) -> list[str]:
+    """
+    ffmpeg output options for one rendition. They go before that output's
+    path, every output maps the same decoded audio stream.
+    """
+    codec = CODECS[profile.codec]
+    args = ["-map", "0:a:0", "-c:a", codec.encoder]
+
+    if profile.codec == AudioCodec.MP3 and profile.vbr:
+        args += ["-q:a", str(lame_vbr_quality(profile.bitrate))]
+    else:
+        # The native AAC encoder is ABR, -b:a is its target either way
+        args += ["-b:a", f"{profile.bitrate}k"]
+        if profile.codec == AudioCodec.OPUS:
+            args += ["-vbr", "on" if profile.vbr else "off"]
+
+    if profile.sample_rate:
+        args += ["-ar", str(profile.sample_rate)]
+    if profile.channels:
+        args += ["-ac", str(profile.channels)]
+
+    return args + ["-f", codec.format]
+
+
+def job_output(job, rendition: str | None = None) -> tuple[str, str, str]:
+    """
+    Storage key, content type and file extension of a finished job's output:
+    the named rendition, or its first one (the plain MP3 for jobs without
+    renditions) when no name is given.
+    """
+    if not job.renditions:
+        if rendition is not None:
+            raise RenditionNotFoundException
+        return job.output_key, "audio/mpeg", "mp3"
+
+    profiles = [OutputProfile.model_validate(profile) for profile in job.renditions]
+    if rendition is None:
+        profile = profiles[0]
+    else:
+        profile = next((p for p in profiles if p.name == rendition), None)
+        if profile is None:
+            raise RenditionNotFoundException
+
+    codec = CODECS[profile.codec]
+    return rendition_key(job.user_id, job.id, profile), codec.content_type, codec.extension
+
+
+def job_output_keys(job) -> list[str]:
+    if job.renditions:
+        return [
+            rendition_key(job.user_id, job.id, OutputProfile.model_validate(profile))
+            for profile in job.renditions
+        ]
+    return [job.output_key] if job.output_key else []
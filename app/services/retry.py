@@ -0,0 +1,55 @@
+import errno
+import random
+from sqlalchemy.exc import DBAPIError, DisconnectionError, InterfaceError, OperationalError
+from app.core.config import settings
+from app.domain.errors import ConversionError
+from app.domain.exceptions import (
+    ConversionFailedException,
+    FfmpegKilledException,
+    StorageError,
+    StorageUnavailableError,
+)
+
+# Connection-level database failures, as opposed to errors in a statement
+TRANSIENT_DB_ERRORS = (OperationalError, InterfaceError, DisconnectionError)
+
+
+def classify_failure(exc: BaseException) -> tuple[ConversionError, bool]:
+    """
+    Maps a conversion failure to the job's error code and whether it is
+    transient. Transient failures depend on the worker's surroundings and
+    may pass on a retry; the rest would fail the same way every time.
+    """
+    if isinstance(exc, StorageUnavailableError):
+        return ConversionError.STORAGE_UNAVAILABLE, True
+    if isinstance(exc, StorageError):
+        # Missing object, permissions: retrying won't change them
+        return ConversionError.STORAGE_ERROR, False
+
+    if isinstance(exc, (FfmpegKilledException, MemoryError)):
+        return ConversionError.RESOURCE_EXHAUSTED, True
+    if isinstance(exc, OSError) and exc.errno == errno.ENOMEM:
+        return ConversionError.RESOURCE_EXHAUSTED, True
+    if isinstance(exc, ConversionFailedException):
+        # ffmpeg rejected the input
+        return ConversionError.FFMPEG_FAILED, False
+
+    if isinstance(exc, TRANSIENT_DB_ERRORS):
+        return ConversionError.DATABASE_ERROR, True
+    if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+        return ConversionError.DATABASE_ERROR, True
+
+    return ConversionError.UNKNOWN_ERROR, False
+
+
+def retry_delay(retry: int) -> float:
+    """
+    Seconds to wait before the given retry (1 for the first): exponential
+    backoff with "equal jitter", so jobs that failed together (e.g. during a
+    storage outage) don't all come back at the same moment.
+    """
+    cap = min(
+        settings.CONVERSION_RETRY_BACKOFF_SECONDS * 2 ** (retry - 1),
+        settings.CONVERSION_RETRY_BACKOFF_MAX_SECONDS,
+    )
+    return cap / 2 + random.uniform(0, cap / 2)
@@ -1,18 +1,206 @@
 from minio import Minio
 from minio.error import S3Error
+from minio.commonconfig import ENABLED, Filter
+from minio.lifecycleconfig import LifecycleConfig, Rule, AbortIncompleteMultipartUpload
 from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import STORAGE_OPERATION_DURATION, STORAGE_BYTES, STORAGE_ERRORS
 from app.domain.exceptions import (
     StorageError, 
     ObjectNotFoundError, 
     StoragePermissionError, 
     StorageUnavailableError,
 )
+from abc import ABC, abstractmethod
+from pydantic import BaseModel
 from typing import BinaryIO, IO
+from datetime import timedelta
+from functools import wraps
+import math
 import os
-from urllib3.exceptions import MaxRetryError, NewConnectionError
+import time
+from urllib3.exceptions import (
+    IncompleteRead,
+    MaxRetryError,
+    NewConnectionError,
+    ProtocolError,
+    ReadTimeoutError,
+    SSLError,
+)
+
+logger = get_logger(__name__)
+
+# S3 multipart limits
+MIN_PART_SIZE = 5 * 1024 * 1024 # 5MiB
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024 # 5GiB
+MAX_PARTS = 10_000
+
+ABORT_INCOMPLETE_UPLOADS_RULE_ID = "abort-incomplete-multipart-uploads"
+
+# Raised by urllib3 when the connection drops while a response body is read
+BODY_READ_ERRORS = (
+    ProtocolError,
+    ReadTimeoutError,
+    IncompleteRead,
+    SSLError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def observed(operation: str):
+    """
+    Records latency and failures of a storage call under the given operation
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except StorageError as e:
+                STORAGE_ERRORS.labels(operation, type(e).__name__).inc()
+                raise
+            finally:
+                STORAGE_OPERATION_DURATION.labels(operation).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class CountingReader:
+    """
+    Counts bytes read from a stream whose length isn't known upfront
+    """
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class ObjectStream:
+    """
+    Wraps the urllib3 response of a download. The connection can still drop
+    while the body is read, long after get_object returned; those errors are
+    raised as StorageUnavailableError, like a request that failed outright.
+    """
+    def __init__(self, response, object_name: str):
+        self.response = response
+        self.object_name = object_name
+
+    def read(self, size: int | None = None) -> bytes:
+        try:
+            return self.response.read(size)
+        except BODY_READ_ERRORS as e:
+            raise self._unavailable() from e
+
+    def stream(self, chunk_size: int):
+        try:
+            yield from self.response.stream(chunk_size)
+        except BODY_READ_ERRORS as e:
+            raise self._unavailable() from e
+
+    def close(self) -> None:
+        self.response.close()
+
+    def release_conn(self) -> None:
+        self.response.release_conn()
+
+    def _unavailable(self) -> StorageUnavailableError:
+        STORAGE_ERRORS.labels("download", StorageUnavailableError.__name__).inc()
+        return StorageUnavailableError(
+            f"Connection lost while downloading {self.object_name}"
+        )
+
+
+class ObjectStat(BaseModel):
+    size: int
+    etag: str
+    content_type: str | None = None
+
+
+class StorageService(ABC):
+    """
+    Object storage backend. Selected with STORAGE_BACKEND, see
+    build_storage_service.
+
+    download_file returns a stream with read(), stream(chunk_size), close()
+    and release_conn(), like the urllib3 response MinIO hands back.
+    """
+    # Whether clients can be sent to presigned URLs (redirected downloads,
+    # direct uploads). Backends without them are proxied by the API.
+    supports_presigned_urls = True
+
+    @abstractmethod
+    def upload_file(
+        self,
+        object_name: str,
+        file: BinaryIO,
+        content_type: str,
+        length: int | None = None,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def stat_file(self, object_name: str) -> ObjectStat:
+        pass
+
+    @abstractmethod
+    def download_file(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+    ) -> IO[bytes]:
+        pass
+
+    @abstractmethod
+    def delete_file(self, object_name: str) -> None:
+        pass
 
+    @abstractmethod
+    def get_presigned_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(minutes=15),
+        public: bool = False,
+        response_headers: dict[str, str] | None = None,
+    ) -> str:
+        pass
 
-class StorageService:
+    @abstractmethod
+    def get_presigned_upload_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(hours=1),
+    ) -> str:
+        pass
+
+    def local_path(self, object_name: str) -> str | None:
+        """
+        Path of the object on a filesystem this process can read, for
+        backends that keep objects as local files. None otherwise.
+        """
+        return None
+
+    def upload_path(self, object_name: str, path: str, content_type: str) -> None:
+        """
+        Stores a local file as the object. Backends may move the file into
+        place, so the caller must not use path afterwards.
+        """
+        with open(path, "rb") as f:
+            self.upload_file(
+                object_name=object_name,
+                file=f,
+                content_type=content_type,
+                length=os.path.getsize(path),
+            )
+
+
+class MinioStorageService(StorageService):
     def __init__(self):
         self.client = Minio(
             endpoint=settings.STORAGE_ENDPOINT,
@@ -21,6 +209,16 @@ class StorageService:
             secure=settings.STORAGE_SECURE,
         )
 
+        # URLs handed to clients must be signed for the host they will call.
+        # Presigning is done locally, the region is given so it needs no request.
+        self.public_client = Minio(
+            endpoint=settings.STORAGE_PUBLIC_ENDPOINT or settings.STORAGE_ENDPOINT,
+            access_key=settings.STORAGE_ACCESS_KEY,
+            secret_key=settings.STORAGE_SECRET_KEY,
+            secure=settings.STORAGE_PUBLIC_SECURE,
+            region=settings.STORAGE_REGION,
+        )
+
         self.bucket = settings.STORAGE_BUCKET_NAME
         try:
             if not self.client.bucket_exists(self.bucket):
@@ -31,7 +229,38 @@ class StorageService:
             if e.code in ("AccessDenied", "InvalidAccessKeyId"):
                 raise StoragePermissionError("Storage access denied")
             raise StorageError("Storage error")
+
+        if settings.STORAGE_ABORT_INCOMPLETE_UPLOADS_DAYS > 0:
+            self._ensure_abort_incomplete_uploads_rule()
     
+    def _ensure_abort_incomplete_uploads_rule(self):
+        """
+        Installs a bucket lifecycle rule that aborts multipart uploads left
+        behind by crashed processes. Failed uploads are aborted by the client
+        itself, this only catches the ones nobody is left to clean up.
+        """
+        try:
+            config = self.client.get_bucket_lifecycle(self.bucket)
+            rules = list(config.rules) if config else []
+            if any(rule.rule_id == ABORT_INCOMPLETE_UPLOADS_RULE_ID for rule in rules):
+                return
+
+            rules.append(
+                Rule(
+                    status=ENABLED,
+                    rule_filter=Filter(prefix=""),
+                    rule_id=ABORT_INCOMPLETE_UPLOADS_RULE_ID,
+                    abort_incomplete_multipart_upload=AbortIncompleteMultipartUpload(
+                        days_after_initiation=settings.STORAGE_ABORT_INCOMPLETE_UPLOADS_DAYS,
+                    ),
+                )
+            )
+            self.client.set_bucket_lifecycle(self.bucket, LifecycleConfig(rules))
+
+        except (MaxRetryError, NewConnectionError, S3Error) as e:
+            # Not fatal, some S3-compatible stores don't support lifecycles
+            logger.warning(f"Could not set lifecycle rule on {self.bucket}: {e}")
+
     def _ensure_bucket_exists(self):
         """
         Ensures that the storage bucket exists; creates it if it does not.
@@ -50,19 +279,65 @@ class StorageService:
             raise StorageError(f"Failed to initialize storage: {e}") from e
 
 
+    @staticmethod
+    def _remaining_length(file: BinaryIO) -> int:
+        """
+        Returns how many bytes are left to read from a seekable file, or -1
+        for streams (pipes, wrappers) whose length can't be known upfront.
+        """
+        try:
+            position = file.tell()
+            end = file.seek(0, os.SEEK_END)
+            file.seek(position)
+            return end - position
+        except (AttributeError, OSError, ValueError):
+            return -1
+
+    @staticmethod
+    def _part_size_for(length: int) -> int:
+        """
+        Picks a part size that splits the object into roughly
+        STORAGE_UPLOAD_TARGET_PARTS parts, so big files get enough parts to
+        keep every upload thread busy and small files aren't over-split.
+        """
+        if length < 0:
+            # Unknown length, the client buffers one part at a time
+            return settings.STORAGE_UPLOAD_PART_SIZE
+
+        part_size = max(
+            math.ceil(length / settings.STORAGE_UPLOAD_TARGET_PARTS),
+            math.ceil(length / MAX_PARTS),
+            MIN_PART_SIZE,
+        )
+        # Round up to a whole MiB
+        part_size = math.ceil(part_size / (1024 * 1024)) * 1024 * 1024
+        return min(part_size, MAX_PART_SIZE)
+
+    @observed("upload")
     def upload_file(
         self,
         object_name: str,
         file: BinaryIO,
         content_type: str,
+        length: int | None = None,
     ) -> None:
+        """
+        Uploads the file, in parallel parts when it is large enough.
+        At most STORAGE_UPLOAD_CONCURRENCY parts are held in memory.
+        """
+        if length is None:
+            length = self._remaining_length(file)
+        if length < 0:
+            file = CountingReader(file)
+
         try:
             self.client.put_object(
                 bucket_name=self.bucket,
                 object_name=object_name,
                 data=file,
-                length=-1,
-                part_size=10*1024*1024, # 10MB
+                length=length,
+                part_size=self._part_size_for(length),
+                num_parallel_uploads=settings.STORAGE_UPLOAD_CONCURRENCY,
                 content_type=content_type,
             )
 
@@ -83,13 +358,58 @@ class StorageService:
             raise StorageError(
                 f"Failed to upload file {object_name}"
             ) from e
+
+        STORAGE_BYTES.labels("upload").inc(length if length >= 0 else file.bytes_read)
         
 
-    def download_file(self, object_name: str) -> IO[bytes]:
+    @observed("stat")
+    def stat_file(self, object_name: str) -> ObjectStat:
+        """
+        Returns object metadata (size, etag, content type) without reading the body.
+        """
+        try:
+            stat = self.client.stat_object(
+                bucket_name=self.bucket,
+                object_name=object_name,
+            )
+            return ObjectStat(size=stat.size, etag=stat.etag, content_type=stat.content_type)
+
+        except (MaxRetryError, NewConnectionError) as e:
+            raise StorageUnavailableError("Object storage unavailable") from e
+
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                raise ObjectNotFoundError(
+                    f"Object not found: {object_name}"
+                ) from e
+
+            if e.code in ("AccessDenied", "InvalidAccessKeyId"):
+                raise StoragePermissionError(
+                    f"Access denied for object: {object_name}"
+                ) from e
+
+            raise StorageError(
+                f"Storage error while reading metadata of {object_name}"
+            ) from e
+
+
+    @observed("download")
+    def download_file(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+    ) -> IO[bytes]:
+        """
+        Opens a stream to the object. A non-zero length limits the stream to
+        that many bytes starting at offset (ranged GET).
+        """
         try:
-            return self.client.get_object(
+            response = self.client.get_object(
                 bucket_name=self.bucket,
                 object_name=object_name,
+                offset=offset,
+                length=length,
             )
 
         except (MaxRetryError, NewConnectionError) as e:
@@ -114,3 +434,85 @@ class StorageService:
             raise StorageError(
                 f"Storage error while downloading {object_name}"
             ) from e
+
+        STORAGE_BYTES.labels("download").inc(int(response.headers.get("Content-Length", 0)))
+        return ObjectStream(response, object_name)
+
+
+    @observed("delete")
+    def delete_file(self, object_name: str) -> None:
+        try:
+            self.client.remove_object(
+                bucket_name=self.bucket,
+                object_name=object_name,
+            )
+
+        except (MaxRetryError, NewConnectionError) as e:
+            raise StorageUnavailableError("Object storage unavailable") from e
+
+        except S3Error as e:
+            if e.code in ("AccessDenied", "InvalidAccessKeyId"):
+                raise StoragePermissionError(
+                    f"Access denied for object: {object_name}"
+                ) from e
+
+            raise StorageError(
+                f"Storage error while deleting {object_name}"
+            ) from e
+
+
+    def get_presigned_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(minutes=15),
+        public: bool = False,
+        response_headers: dict[str, str] | None = None,
+    ) -> str:
+        """
+        Returns a short-lived URL that can GET the object without credentials.
+        Public URLs are signed for STORAGE_PUBLIC_ENDPOINT and meant for clients.
+        """
+        client = self.public_client if public else self.client
+        try:
+            return client.presigned_get_object(
+                bucket_name=self.bucket,
+                object_name=object_name,
+                expires=expires,
+                response_headers=response_headers,
+            )
+
+        except (MaxRetryError, NewConnectionError) as e:
+            raise StorageUnavailableError("Object storage unavailable") from e
+
+        except S3Error as e:
+            raise StorageError(
+                f"Failed to presign {object_name}"
+            ) from e
+
+
+    def get_presigned_upload_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(hours=1),
+    ) -> str:
+        """
+        Returns a client-facing URL that can PUT the object directly to storage.
+        """
+        try:
+            return self.public_client.presigned_put_object(
+                bucket_name=self.bucket,
+                object_name=object_name,
+                expires=expires,
+            )
+
+        except S3Error as e:
+            raise StorageError(
+                f"Failed to presign upload of {object_name}"
+            ) from e
+
+
+def build_storage_service() -> StorageService:
+    if settings.STORAGE_BACKEND == "local":
+        from app.services.local_storage import LocalStorageService
+        return LocalStorageService(settings.STORAGE_LOCAL_ROOT)
+    return MinioStorageService()
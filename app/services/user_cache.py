@@ -0,0 +1,124 @@
+import threading
+from datetime import datetime
+from typing import Awaitable, Callable, TypeVar
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database.models.user import User
+from app.services.cache.base import Cache
+from app.services.cache.memory import MemoryCache
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class UserCache:
+    """
+    Caches users resolved from access tokens, keyed by token subject, so
+    authenticated requests don't query Postgres every time.
+
+    Only non-secret fields are cached; the password hash never leaves the DB.
+    Backend errors are logged and treated as misses. The async methods run
+    calls to blocking backends (Redis) on the threadpool.
+    """
+    def __init__(self, backend: Cache, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_user(self, username: str, load: Callable[[str], User | None]) -> User | None:
+        user = self._read(username)
+        if user is not None:
+            return user
+
+        user = load(username)
+        if user is not None:
+            self._write(user)
+        return user
+
+    async def aget_user(
+        self,
+        username: str,
+        load: Callable[[str], Awaitable[User | None]],
+    ) -> User | None:
+        user = await self._offload(self._read, username)
+        if user is not None:
+            return user
+
+        user = await load(username)
+        if user is not None:
+            await self._offload(self._write, user)
+        return user
+
+    async def _offload(self, func: Callable[..., T], *args) -> T:
+        if self.backend.blocking:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    def _read(self, username: str) -> User | None:
+        try:
+            cached = self.backend.get(self._key(username))
+        except Exception as e:
+            logger.warning(f"User cache read failed: {e}")
+            cached = None
+
+        if cached is None:
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return User(
+            id=cached["id"],
+            username=cached["username"],
+            created_at=datetime.fromisoformat(cached["created_at"]),
+        )
+
+    def _write(self, user: User) -> None:
+        try:
+            self.backend.set(
+                self._key(user.username),
+                {
+                    "id": user.id,
+                    "username": user.username,
+                    "created_at": user.created_at.isoformat(),
+                },
+                self.ttl,
+            )
+        except Exception as e:
+            logger.warning(f"User cache write failed: {e}")
+
+    def invalidate(self, username: str) -> None:
+        try:
+            self.backend.delete(self._key(username))
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed: {e}")
+
+    async def ainvalidate(self, username: str) -> None:
+        await self._offload(self.invalidate, username)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return f"user:{username}"
+
+
+def build_cache_backend() -> Cache:
+    if settings.USER_CACHE_BACKEND == "redis":
+        from app.services.cache.redis import RedisCache
+        return RedisCache(settings.USER_CACHE_REDIS_URL)
+    return MemoryCache(maxsize=settings.USER_CACHE_MAX_SIZE)
+
+
+user_cache = UserCache(build_cache_backend(), ttl=settings.USER_CACHE_TTL_SECONDS)
@@ -1,5 +1,7 @@
 from celery import Celery
+from kombu import Queue
 from app.core.config import settings
+from app.workers.queues import CONVERSION_QUEUES, STANDARD_QUEUE, CONVERT_VIDEO_TASK
 
 celery_app = Celery(
     "video_to_mp3",
@@ -13,6 +15,17 @@ celery_app.conf.update(
     task_track_started=True,
     task_acks_late=True,
     worker_prefetch_multiplier=1,  # <-- fixed typo
+    # A worker started without -Q consumes all of these
+    task_queues=(Queue("celery"), *CONVERSION_QUEUES),
+    task_routes={CONVERT_VIDEO_TASK: {"queue": STANDARD_QUEUE}},
+    beat_schedule={
+        "reap-stale-jobs": {
+            "task": "app.workers.tasks.reap_stale_jobs",
+            "schedule": settings.REAPER_INTERVAL_SECONDS,
+            # A run that waited a whole interval is superseded by the next one
+            "options": {"expires": settings.REAPER_INTERVAL_SECONDS},
+        },
+    },
 )
 
 # Celery needs to know where task functions are defind
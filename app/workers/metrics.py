@@ -0,0 +1,71 @@
+import os
+from celery.signals import worker_init, worker_process_shutdown
+from prometheus_client import start_http_server, multiprocess
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import (
+    MULTIPROCESS,
+    WORKER_DB_POOL_CHECKED_OUT,
+    WORKER_DB_POOL_CHECKOUTS,
+    WORKER_DB_POOL_IDLE,
+    WORKER_DB_POOL_OVERFLOW,
+    WORKER_DB_POOL_OVERFLOW_CHECKOUTS,
+    WORKER_DB_POOL_TIMEOUTS,
+    WORKER_DB_POOL_WAIT,
+    create_registry,
+)
+from app.database.db import engine
+from app.database.pool import PoolMetrics
+
+logger = get_logger(__name__)
+
+
+class WorkerPoolMetrics(PoolMetrics):
+    """
+    Also publishes the pool's counters and state as Prometheus metrics, so
+    each prefork child reports the connections it actually holds
+    """
+    def record_checkout(self, waited: float, overflowed: bool) -> None:
+        super().record_checkout(waited, overflowed)
+        WORKER_DB_POOL_CHECKOUTS.inc()
+        if overflowed:
+            WORKER_DB_POOL_OVERFLOW_CHECKOUTS.inc()
+        WORKER_DB_POOL_WAIT.inc(waited)
+
+    def record_timeout(self) -> None:
+        super().record_timeout()
+        WORKER_DB_POOL_TIMEOUTS.inc()
+
+    def record_state(self, checked_out: int, idle: int, overflow: int) -> None:
+        WORKER_DB_POOL_CHECKED_OUT.set(checked_out)
+        WORKER_DB_POOL_IDLE.set(idle)
+        WORKER_DB_POOL_OVERFLOW.set(overflow)
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """
+    Serves the worker's metrics on WORKER_METRICS_PORT from the main worker
+    process. Conversions run in prefork children, so their samples only show
+    up here when PROMETHEUS_MULTIPROC_DIR is set.
+    """
+    if not settings.WORKER_METRICS_PORT:
+        return
+
+    if not MULTIPROCESS:
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR is not set, metrics of prefork children won't be exported"
+        )
+
+    # Installed before the children are forked, they inherit it with the
+    # pool and keep it when the pool is reset after the fork
+    engine.pool.metrics = WorkerPoolMetrics()
+
+    start_http_server(settings.WORKER_METRICS_PORT, registry=create_registry())
+    logger.info(f"Worker metrics exported on :{settings.WORKER_METRICS_PORT}")
+
+
+@worker_process_shutdown.connect
+def remove_process_metrics(pid=None, **kwargs):
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,25 @@
+"""
+Outbox relay process, publishes queued tasks from the outbox table:
+
+    python -m app.workers.outbox_relay
+"""
+import signal
+from app.core.logging import setup_logging
+from app.database.db import engine
+from app.services.outbox import OutboxRelay
+from app.services.queue.celery import CeleryQueue
+from app.workers.celery_app import celery_app
+
+
+def main():
+    setup_logging()
+    relay = OutboxRelay(CeleryQueue(celery_app), bind=engine)
+
+    signal.signal(signal.SIGTERM, lambda *_: relay.stop())
+    signal.signal(signal.SIGINT, lambda *_: relay.stop())
+
+    relay.run()
+
+
+if __name__ == "__main__":
+    main()
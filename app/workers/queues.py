@@ -0,0 +1,37 @@
+from kombu import Queue
+from app.core.config import settings
+
+CONVERT_VIDEO_TASK = "app.workers.tasks.convert_video"
+
+SHORT_QUEUE = "convert.short"
+STANDARD_QUEUE = "convert.standard"
+LONG_QUEUE = "convert.long"
+
+# Every class has its own queue so short clips never wait behind hours of
+# video. A worker consuming several of them takes from each in turn.
+CONVERSION_QUEUES = (
+    Queue(SHORT_QUEUE, routing_key=SHORT_QUEUE),
+    Queue(STANDARD_QUEUE, routing_key=STANDARD_QUEUE),
+    Queue(LONG_QUEUE, routing_key=LONG_QUEUE),
+)
+
+
+def conversion_queue_for(size: int | None, duration: float | None = None) -> str:
+    """
+    Picks the conversion queue from the input size in bytes and, when it has
+    been probed, its duration in seconds. Unknown sizes go to the standard queue.
+    """
+    if (size is not None and size >= settings.CONVERSION_QUEUE_LONG_MIN_BYTES) or (
+        duration is not None and duration >= settings.CONVERSION_QUEUE_LONG_MIN_SECONDS
+    ):
+        return LONG_QUEUE
+
+    if size is None:
+        return STANDARD_QUEUE
+
+    if size <= settings.CONVERSION_QUEUE_SHORT_MAX_BYTES and (
+        duration is None or duration <= settings.CONVERSION_QUEUE_SHORT_MAX_SECONDS
+    ):
+        return SHORT_QUEUE
+
+    return STANDARD_QUEUE
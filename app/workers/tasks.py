@@ -1,15 +1,41 @@
 from app.workers.celery_app import celery_app
+from celery.signals import worker_process_init
 from sqlmodel import Session
-from app.database.db import engine
+from uuid import UUID
+from app.database.db import engine, reset_pool_after_fork
+from app.core.config import settings
 from app.services.conversion import ConversionService
+from app.services.reaper import JobReaper
+from app.services.retry import TRANSIENT_DB_ERRORS, retry_delay
+from app.domain.exceptions import ConversionRetryException
+from app.workers import metrics  # registers the exporter's signal handlers
 
-@celery_app.task(
-    bind=True,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
-    retry_kwargs={"max_retries": 3},
-)
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    # Prefork children inherit the parent's pool, never share its connections
+    reset_pool_after_fork()
+
+# No task-level retry limit: the job counts its own retries, which also
+# survives the reaper re-enqueueing it
+@celery_app.task(bind=True, max_retries=None)
 def convert_video(self, job_id: str):
+    try:
+        with Session(engine) as db:
+            service = ConversionService(db=db)
+            service.process(UUID(job_id))
+
+    except ConversionRetryException as e:
+        raise self.retry(exc=e, countdown=e.countdown)
+
+    except TRANSIENT_DB_ERRORS as e:
+        # The database failed before the job could record it
+        raise self.retry(
+            exc=e,
+            countdown=retry_delay(self.request.retries + 1),
+            max_retries=settings.CONVERSION_MAX_RETRIES,
+        )
+
+@celery_app.task
+def reap_stale_jobs():
     with Session(engine) as db:
-        service = ConversionService(db=db)
-        service.process(job_id)
\ No newline at end of file
+        JobReaper(db).reap()
\ No newline at end of file
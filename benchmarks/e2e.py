@@ -0,0 +1,339 @@
+"""
+End-to-end benchmark: runs the API in-process against local stand-ins
+(SQLite or a local Postgres, the local filesystem storage backend, and
+FakeQueue with in-process conversion workers fed by the real outbox relay), uploads
+synthetic videos generated with ffmpeg's lavfi sources and measures
+
+- upload throughput (POST /media/upload)
+- conversion time per minute of media
+- status endpoint RPS and latency (GET /media/{id}/status)
+- download throughput (GET /media/{id}/download)
+
+Results are printed as JSON. Save a run and pass it as the baseline of a
+later one to fail on regressions:
+
+    python -m benchmarks.e2e --output main.json
+    python -m benchmarks.e2e --baseline main.json --max-regression 15
+
+Requires ffmpeg/ffprobe on PATH and the packages in benchmarks/requirements.txt.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from uuid import UUID, uuid4
+import httpx
+
+# name, seconds of media, container, video args, audio args
+SAMPLES = [
+    ("mp4-h264-aac", 15, "mp4", ["-c:v", "libx264", "-preset", "ultrafast"], ["-c:a", "aac"]),
+    ("mkv-h264-mp3", 60, "mkv", ["-c:v", "libx264", "-preset", "ultrafast"], ["-c:a", "libmp3lame"]),
+    ("webm-vp8-opus", 120, "webm", ["-c:v", "libvpx", "-deadline", "realtime", "-cpu-used", "8"], ["-c:a", "libopus"]),
+]
+
+CONTENT_TYPES = {
+    "mp4": "video/mp4",
+    "mkv": "video/x-matroska",
+    "webm": "video/webm",
+}
+
+# metric path -> True when higher is better
+TRACKED_METRICS = {
+    ("upload", "mb_per_s"): True,
+    ("conversion", "seconds_per_media_minute"): False,
+    ("status", "requests_per_s"): True,
+    ("status", "p99_ms"): False,
+    ("download", "mb_per_s"): True,
+}
+
+MB = 1024 * 1024
+
+
+def generate_video(path: str, seconds: float, video_args: list[str], audio_args: list[str], frequency: int) -> None:
+    """
+    Synthetic test video; the tone frequency makes every file unique so
+    uploads are never deduplicated against an earlier run.
+    """
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-f", "lavfi", "-i", f"testsrc2=size=640x360:rate=25:duration={seconds}",
+            "-f", "lavfi", "-i", f"sine=frequency={frequency}:sample_rate=48000:duration={seconds}",
+            *video_args, *audio_args, "-shortest", path,
+        ],
+        check=True,
+    )
+
+
+def environment() -> dict:
+    ffmpeg = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": ffmpeg.stdout.splitlines()[0] if ffmpeg.returncode == 0 else None,
+        "commit": commit.stdout.strip() or None,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def configure(args: argparse.Namespace, workdir: str) -> None:
+    """
+    Settings are read at import time, so this must run before any app import.
+    """
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ["RABBITMQ_URL"] = "memory://"
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["STORAGE_LOCAL_ROOT"] = os.path.join(workdir, "objects")
+    os.environ.setdefault("SECRET_KEY", uuid4().hex)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def start_stack(workers: int):
+    from sqlmodel import SQLModel, Session
+    import uvicorn
+    from app.main import app
+    from app.core.metrics import create_registry
+    from app.database.db import engine
+    from app.database.models.outbox import OutboxMessage  # noqa: F401, registers the table
+    from app.services.async_storage import AsyncStorageService
+    from app.services.conversion import ConversionService
+    from app.services.events import JobEventHub
+    from app.services.outbox import OutboxRelay
+    from app.services.password_pool import PasswordHashingPool
+    from app.services.queue.fake import FakeQueue
+    from app.services.storage import build_storage_service
+    from benchmarks.standins import InlineWorker
+
+    SQLModel.metadata.create_all(engine)
+    storage = build_storage_service()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.storage_service = storage
+        app.state.async_storage_service = AsyncStorageService(storage)
+        # Never started: nothing here streams events
+        app.state.job_event_hub = JobEventHub("memory://")
+        app.state.password_pool = PasswordHashingPool()
+        app.state.metrics_registry = create_registry()
+        yield
+        app.state.password_pool.shutdown()
+
+    app.router.lifespan_context = lifespan
+
+    def process(job_id: str) -> None:
+        with Session(engine) as db:
+            ConversionService(db, storage=storage).process(UUID(job_id))
+
+    fake_queue = FakeQueue()
+    worker = InlineWorker(fake_queue, process, concurrency=workers)
+    worker.start()
+
+    relay = OutboxRelay(fake_queue, engine, poll_interval=0.05)
+    threading.Thread(target=relay.run, daemon=True).start()
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    return f"http://127.0.0.1:{port}", server, relay, worker
+
+
+def login(client: httpx.Client) -> dict:
+    username = f"bench-{uuid4().hex[:12]}"
+    password = "benchmark-password"
+    client.post("/auth/register", json={"username": username, "password": password}).raise_for_status()
+    response = client.post("/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def wait_for_jobs(
+    client: httpx.Client,
+    headers: dict,
+    job_ids: list[str],
+    worker,
+    timeout: float,
+) -> dict[str, dict]:
+    deadline = time.monotonic() + timeout
+    finished: dict[str, dict] = {}
+    while len(finished) < len(job_ids):
+        worker.check()
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{len(job_ids) - len(finished)} jobs did not finish in {timeout}s")
+        for job_id in job_ids:
+            if job_id in finished:
+                continue
+            job = client.get(f"/media/{job_id}/status", headers=headers).json()
+            if job["status"] in ("DONE", "FAILED"):
+                finished[job_id] = job
+        time.sleep(0.2)
+    return finished
+
+
+def run(args: argparse.Namespace, workdir: str) -> dict:
+    base_url, server, relay, worker = start_stack(args.workers)
+    from benchmarks.status_latency import run as run_status
+
+    videos = []
+    for repeat in range(args.repeat):
+        for index, (name, seconds, container, video_args, audio_args) in enumerate(SAMPLES):
+            seconds = round(seconds * args.scale, 2)
+            path = os.path.join(workdir, f"{name}-{repeat}.{container}")
+            generate_video(path, seconds, video_args, audio_args, 220 + 40 * (repeat * len(SAMPLES) + index))
+            videos.append((name, seconds, path, CONTENT_TYPES[container]))
+
+    try:
+        with httpx.Client(base_url=base_url, timeout=600) as client:
+            headers = login(client)
+
+            uploads = []
+            for name, seconds, path, content_type in videos:
+                size = os.path.getsize(path)
+                started = time.perf_counter()
+                with open(path, "rb") as f:
+                    response = client.post(
+                        "/media/upload",
+                        files={"file": (os.path.basename(path), f, content_type)},
+                        headers=headers,
+                    )
+                response.raise_for_status()
+                uploads.append((name, seconds, size, time.perf_counter() - started, response.json()["id"]))
+
+            jobs = wait_for_jobs(client, headers, [u[4] for u in uploads], worker, args.timeout)
+            failed = [job_id for job_id, job in jobs.items() if job["status"] != "DONE"]
+            if failed:
+                raise RuntimeError(f"Conversions failed: {[jobs[job_id].get('error') for job_id in failed]}")
+
+            downloaded, download_seconds = 0, 0.0
+            for *_, job_id in uploads:
+                started = time.perf_counter()
+                with client.stream("GET", f"/media/{job_id}/download", params={"redirect": False}, headers=headers) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_bytes():
+                        downloaded += len(chunk)
+                download_seconds += time.perf_counter() - started
+
+        # Direct uploads need presigned URLs, so poll one of the jobs above
+        status = asyncio.run(run_status(
+            base_url, args.concurrency, args.status_duration, args.label, job=(headers, uploads[0][4]),
+        ))
+    finally:
+        relay.stop()
+        server.should_exit = True
+
+    conversions = [
+        {
+            "sample": name,
+            "media_seconds": seconds,
+            "seconds": round(worker.durations[job_id], 3),
+            "seconds_per_media_minute": round(worker.durations[job_id] / seconds * 60, 3),
+        }
+        for name, seconds, _, _, job_id in uploads
+    ]
+    uploaded = sum(u[2] for u in uploads)
+    upload_seconds = sum(u[3] for u in uploads)
+    media_seconds = sum(u[1] for u in uploads)
+    return {
+        "label": args.label,
+        "environment": environment(),
+        "database": os.environ["DATABASE_URL"].split("://")[0],
+        "upload": {
+            "files": len(uploads),
+            "bytes": uploaded,
+            "mb_per_s": round(uploaded / MB / upload_seconds, 2),
+        },
+        "conversion": {
+            "workers": args.workers,
+            "media_seconds": media_seconds,
+            "seconds_per_media_minute": round(sum(worker.durations.values()) / media_seconds * 60, 3),
+            "median_seconds_per_media_minute": statistics.median(c["seconds_per_media_minute"] for c in conversions),
+            "jobs": conversions,
+        },
+        "status": {key: status[key] for key in ("concurrency", "requests", "requests_per_s", "p50_ms", "p99_ms")},
+        "download": {
+            "bytes": downloaded,
+            "mb_per_s": round(downloaded / MB / download_seconds, 2),
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> tuple[dict, list[str]]:
+    """
+    Relative change of every tracked metric, and the ones that got worse by
+    more than max_regression percent.
+    """
+    changes, regressions = {}, []
+    for (section, key), higher_is_better in TRACKED_METRICS.items():
+        before, after = baseline[section][key], results[section][key]
+        if not before:
+            continue
+        change = (after - before) / before * 100
+        name = f"{section}.{key}"
+        changes[name] = f"{change:+.1f}%"
+        if (-change if higher_is_better else change) > max_regression:
+            regressions.append(name)
+    return {"baseline": baseline["label"], **changes}, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file; pass a local Postgres URL to benchmark against it")
+    parser.add_argument("--workers", type=int, default=2, help="in-process conversion workers")
+    parser.add_argument("--repeat", type=int, default=1, help="times each sample video is uploaded")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for sample video lengths")
+    parser.add_argument("--timeout", type=float, default=900.0, help="seconds to wait for conversions")
+    parser.add_argument("--concurrency", type=int, default=50, help="status polling clients")
+    parser.add_argument("--status-duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--output", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="percent; exit non-zero if any metric is worse than the baseline by more")
+    parser.add_argument("--keep", action="store_true", help="keep the working directory")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+        sys.exit("ffmpeg and ffprobe must be on PATH")
+
+    workdir = tempfile.mkdtemp(prefix="bench-e2e-")
+    configure(args, workdir)
+    try:
+        results = run(args, workdir)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["change"], regressions = compare(results, json.load(f), args.max_regression)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    if regressions:
+        sys.exit(f"Regressed by more than {args.max_regression}%: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
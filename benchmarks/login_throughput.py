@@ -0,0 +1,70 @@
+"""
+Measures /auth/login throughput and latency under concurrent clients against
+a running API (make run/app). Registers its own user first. Results are
+printed as JSON, including how many requests were shed with 429.
+
+    python -m benchmarks.login_throughput --base-url http://localhost:8000 --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from uuid import uuid4
+import httpx
+
+
+async def run(base_url: str, concurrency: int, total: int) -> dict:
+    username = f"bench-{uuid4().hex[:12]}"
+    password = "benchmark-password"
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        response = await client.post(
+            "/auth/register",
+            json={"username": username, "password": password},
+        )
+        response.raise_for_status()
+
+        latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/auth/login",
+                    data={"username": username, "password": password},
+                )
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "elapsed_s": round(elapsed, 2),
+        "logins_per_s": round(statuses.get(200, 0) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        "status_counts": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.base_url, args.concurrency, args.requests))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
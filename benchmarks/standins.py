@@ -0,0 +1,54 @@
+"""
+Local stand-ins for the external services, used by the end-to-end benchmark.
+Storage needs none: the local filesystem backend is used as is.
+"""
+import threading
+import time
+from app.domain.exceptions import ConversionRetryException
+from app.services.queue.fake import FakeQueue
+
+
+class InlineWorker:
+    """
+    Stands in for the Celery workers: takes the messages the outbox relay
+    published to a FakeQueue and runs the conversions in-process, timing each.
+    """
+    def __init__(self, fake_queue: FakeQueue, process, concurrency: int = 1):
+        self.queue = fake_queue
+        self.process = process
+        self.durations: dict[str, float] = {}
+        self.errors: list[Exception] = []
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True)
+            for _ in range(concurrency)
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def check(self) -> None:
+        """
+        Re-raises the first error a conversion raised on a worker thread
+        """
+        with self._lock:
+            if self.errors:
+                raise RuntimeError(f"Conversion raised {len(self.errors)} error(s)") from self.errors[0]
+
+    def _run(self) -> None:
+        while True:
+            message = self.queue.consume()
+            job_id = message["args"][0]
+            started = time.perf_counter()
+            try:
+                self.process(job_id)
+            except ConversionRetryException as e:
+                # Same as the Celery task: delivered again after the backoff
+                threading.Timer(e.countdown, self.queue.publish, [message]).start()
+            except Exception as e:
+                # Failures are recorded on the job, anything raised is a bug
+                with self._lock:
+                    self.errors.append(e)
+            with self._lock:
+                self.durations[job_id] = time.perf_counter() - started
@@ -0,0 +1,126 @@
+"""
+Load test for the job polling path (GET /media/{id}/status) against a
+running API. Registers a user, creates a job through POST /media/uploads
+and polls it from concurrent clients. Results are printed as JSON.
+
+To compare the async handlers with the previous sync ones, run it once
+against each build, saving the first run and passing it as the baseline:
+
+    python -m benchmarks.status_latency --label sync --save sync.json
+    python -m benchmarks.status_latency --label async --baseline sync.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from uuid import uuid4
+import httpx
+
+
+async def setup_job(client: httpx.AsyncClient) -> tuple[dict, str]:
+    username = f"bench-{uuid4().hex[:12]}"
+    password = "benchmark-password"
+
+    response = await client.post(
+        "/auth/register",
+        json={"username": username, "password": password},
+    )
+    response.raise_for_status()
+
+    response = await client.post(
+        "/auth/login",
+        data={"username": username, "password": password},
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.post(
+        "/media/uploads",
+        json={"filename": "bench.mp4", "content_type": "video/mp4"},
+        headers=headers,
+    )
+    response.raise_for_status()
+    return headers, response.json()["job"]["id"]
+
+
+async def run(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    label: str,
+    job: tuple[dict, str] | None = None,
+) -> dict:
+    """
+    Polls the status of job (auth headers, job id), or of a new one.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        headers, job_id = job or await setup_job(client)
+
+        latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(f"/media/{job_id}/status", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "label": label,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_s": round(statuses.get(200, 0) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        "status_counts": statuses,
+    }
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    def change(key: str) -> str:
+        before, after = baseline[key], results[key]
+        return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+    return {
+        "baseline": baseline["label"],
+        "requests_per_s": change("requests_per_s"),
+        "p50_ms": change("p50_ms"),
+        "p99_ms": change("p99_ms"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--save", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.base_url, args.concurrency, args.duration, args.label))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["change"] = compare(results, json.load(f))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares upload throughput of MinioStorageService.upload_file with the previous
+fixed-part-size, unknown-length put_object call.
+
+Needs a reachable MinIO (e.g. `docker run -p 9000:9000 minio/minio server /data`)
+and the usual .env. Results are printed as JSON.
+
+    python -m benchmarks.storage_upload --size-mb 512 --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from app.core.config import settings
+from app.services.storage import MinioStorageService
+
+
+def legacy_upload(storage: MinioStorageService, object_name: str, path: str) -> None:
+    # The call MinioStorageService.upload_file made before multipart tuning
+    with open(path, "rb") as f:
+        storage.client.put_object(
+            bucket_name=storage.bucket,
+            object_name=object_name,
+            data=f,
+            length=-1,
+            part_size=10*1024*1024,
+            content_type="application/octet-stream",
+        )
+
+
+def tuned_upload(storage: MinioStorageService, object_name: str, path: str) -> None:
+    with open(path, "rb") as f:
+        storage.upload_file(
+            object_name=object_name,
+            file=f,
+            content_type="application/octet-stream",
+        )
+
+
+def measure(upload, storage: MinioStorageService, path: str, size: int, runs: int) -> dict:
+    throughputs = []
+    for run in range(runs):
+        object_name = f"benchmarks/upload-{upload.__name__}-{run}"
+        started = time.perf_counter()
+        upload(storage, object_name, path)
+        elapsed = time.perf_counter() - started
+        throughputs.append(size / elapsed / (1024 * 1024))
+        storage.delete_file(object_name)
+
+    return {
+        "median_mb_s": round(statistics.median(throughputs), 2),
+        "min_mb_s": round(min(throughputs), 2),
+        "max_mb_s": round(max(throughputs), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    storage = MinioStorageService()
+    size = args.size_mb * 1024 * 1024
+
+    with tempfile.NamedTemporaryFile() as tmp:
+        # Random bytes so nothing in the path can compress them away
+        for _ in range(args.size_mb):
+            tmp.write(os.urandom(1024 * 1024))
+        tmp.flush()
+
+        results = {
+            "size_mb": args.size_mb,
+            "runs": args.runs,
+            "upload_concurrency": settings.STORAGE_UPLOAD_CONCURRENCY,
+            "part_size_mb": MinioStorageService._part_size_for(size) // (1024 * 1024),
+            "legacy": measure(legacy_upload, storage, tmp.name, size, args.runs),
+            "tuned": measure(tuned_upload, storage, tmp.name, size, args.runs),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
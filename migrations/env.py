@@ -7,6 +7,8 @@ import os
 from dotenv import load_dotenv
 from app.database.models.user import User 
 from app.database.models.conversion_jobs import ConversionJob
+from app.database.models.conversion_outputs import ConversionOutput
+from app.database.models.outbox import OutboxMessage
 
 load_dotenv()
 
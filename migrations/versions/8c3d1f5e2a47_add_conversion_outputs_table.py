@@ -0,0 +1,60 @@
+"""add conversion outputs table
+
+Revision ID: 8c3d1f5e2a47
+Revises: 56ff1762b9ce
+Create Date: 2026-02-03 10:14:52.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3d1f5e2a47'
+down_revision: Union[str, Sequence[str], None] = '56ff1762b9ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversion_outputs",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("input_hash", sa.String(), nullable=False),
+        sa.Column("encode_params", sa.String(), nullable=False),
+        sa.Column("output_key", sa.String(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_index(
+        "ix_conversion_outputs_input_hash_encode_params",
+        "conversion_outputs",
+        ["input_hash", "encode_params"],
+        unique=True,
+    )
+
+    op.add_column(
+        "conversion_jobs",
+        sa.Column("input_hash", sa.String(), nullable=True),
+    )
+    op.add_column(
+        "conversion_jobs",
+        sa.Column(
+            "output_id",
+            sa.Uuid(),
+            sa.ForeignKey("conversion_outputs.id"),
+            nullable=True,
+        ),
+    )
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "output_id")
+    op.drop_column("conversion_jobs", "input_hash")
+    op.drop_index(
+        "ix_conversion_outputs_input_hash_encode_params",
+        table_name="conversion_outputs",
+    )
+    op.drop_table("conversion_outputs")
@@ -0,0 +1,29 @@
+"""add queue timing to conversion jobs
+
+Revision ID: a7e2d4c8f1b3
+Revises: f3c9a1d7b2e6
+Create Date: 2026-02-21 15:42:09.731265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e2d4c8f1b3'
+down_revision: Union[str, Sequence[str], None] = 'f3c9a1d7b2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("conversion_jobs", sa.Column("queue", sa.String(), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("queued_at", sa.DateTime(), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("started_at", sa.DateTime(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "started_at")
+    op.drop_column("conversion_jobs", "queued_at")
+    op.drop_column("conversion_jobs", "queue")
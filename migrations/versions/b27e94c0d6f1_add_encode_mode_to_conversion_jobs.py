@@ -0,0 +1,36 @@
+"""add encode mode to conversion jobs
+
+Revision ID: b27e94c0d6f1
+Revises: 8c3d1f5e2a47
+Create Date: 2026-02-05 09:41:27.530916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b27e94c0d6f1'
+down_revision: Union[str, Sequence[str], None] = '8c3d1f5e2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    encodemode_enum = sa.Enum(
+        "COPY",
+        "ENCODE",
+        name="encodemode",
+    )
+    encodemode_enum.create(op.get_bind(), checkfirst=True)
+
+    op.add_column(
+        "conversion_jobs",
+        sa.Column("encode_mode", encodemode_enum, nullable=True),
+    )
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "encode_mode")
+    sa.Enum(name="encodemode").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,45 @@
+"""add outbox messages table
+
+Revision ID: b5d1e8f3a9c4
+Revises: a7e2d4c8f1b3
+Create Date: 2026-02-23 09:18:36.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1e8f3a9c4'
+down_revision: Union[str, Sequence[str], None] = 'a7e2d4c8f1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_messages",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True, nullable=False),
+        sa.Column("task", sa.String(), nullable=False),
+        sa.Column("args", sa.JSON(), nullable=False),
+        sa.Column("queue", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_index(
+        "ix_outbox_messages_unsent",
+        "outbox_messages",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_outbox_messages_unsent",
+        table_name="outbox_messages",
+    )
+    op.drop_table("outbox_messages")
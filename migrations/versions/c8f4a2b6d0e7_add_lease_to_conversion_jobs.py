@@ -0,0 +1,38 @@
+"""add lease to conversion jobs
+
+Revision ID: c8f4a2b6d0e7
+Revises: b5d1e8f3a9c4
+Create Date: 2026-02-25 13:51:27.940162
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f4a2b6d0e7'
+down_revision: Union[str, Sequence[str], None] = 'b5d1e8f3a9c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("conversion_jobs", sa.Column("worker_id", sa.String(), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+
+    op.create_index(
+        "ix_conversion_jobs_status_lease_expires_at",
+        "conversion_jobs",
+        ["status", "lease_expires_at"],
+        unique=False,
+    )
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_conversion_jobs_status_lease_expires_at",
+        table_name="conversion_jobs",
+    )
+    op.drop_column("conversion_jobs", "lease_expires_at")
+    op.drop_column("conversion_jobs", "worker_id")
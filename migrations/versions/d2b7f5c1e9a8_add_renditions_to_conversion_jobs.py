@@ -0,0 +1,25 @@
+"""add renditions to conversion jobs
+
+Revision ID: d2b7f5c1e9a8
+Revises: c8f4a2b6d0e7
+Create Date: 2026-02-28 10:36:14.582930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7f5c1e9a8'
+down_revision: Union[str, Sequence[str], None] = 'c8f4a2b6d0e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("conversion_jobs", sa.Column("renditions", sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "renditions")
@@ -0,0 +1,32 @@
+"""add uploading job status
+
+Revision ID: d4a8e61b9c35
+Revises: b27e94c0d6f1
+Create Date: 2026-02-09 14:02:11.847302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8e61b9c35'
+down_revision: Union[str, Sequence[str], None] = 'b27e94c0d6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE jobstatus ADD VALUE IF NOT EXISTS 'UPLOADING' BEFORE 'PENDING'")
+
+def downgrade() -> None:
+    # Postgres can't drop enum values, rebuild the type without it
+    op.execute("UPDATE conversion_jobs SET status = 'FAILED' WHERE status = 'UPLOADING'")
+    op.execute("ALTER TYPE jobstatus RENAME TO jobstatus_old")
+    op.execute("CREATE TYPE jobstatus AS ENUM ('PENDING', 'PROCESSING', 'DONE', 'FAILED')")
+    op.execute(
+        "ALTER TABLE conversion_jobs ALTER COLUMN status "
+        "TYPE jobstatus USING status::text::jobstatus"
+    )
+    op.execute("DROP TYPE jobstatus_old")
@@ -0,0 +1,29 @@
+"""add progress to conversion jobs
+
+Revision ID: e5b17c3a0f92
+Revises: d4a8e61b9c35
+Create Date: 2026-02-16 11:27:40.362118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b17c3a0f92'
+down_revision: Union[str, Sequence[str], None] = 'd4a8e61b9c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("conversion_jobs", sa.Column("progress", sa.Float(), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("encode_speed", sa.Float(), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("eta_seconds", sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "eta_seconds")
+    op.drop_column("conversion_jobs", "encode_speed")
+    op.drop_column("conversion_jobs", "progress")
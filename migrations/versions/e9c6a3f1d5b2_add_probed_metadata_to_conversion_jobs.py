@@ -0,0 +1,29 @@
+"""add probed metadata to conversion jobs
+
+Revision ID: e9c6a3f1d5b2
+Revises: d2b7f5c1e9a8
+Create Date: 2026-03-02 09:12:47.305518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c6a3f1d5b2'
+down_revision: Union[str, Sequence[str], None] = 'd2b7f5c1e9a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("conversion_jobs", sa.Column("input_size", sa.BigInteger(), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("duration_seconds", sa.Float(), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("media_info", sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "media_info")
+    op.drop_column("conversion_jobs", "duration_seconds")
+    op.drop_column("conversion_jobs", "input_size")
@@ -0,0 +1,44 @@
+"""add (user_id, created_at, id) index to conversion jobs
+
+Revision ID: f3c9a1d7b2e6
+Revises: e5b17c3a0f92
+Create Date: 2026-02-19 10:04:52.518301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a1d7b2e6'
+down_revision: Union[str, Sequence[str], None] = 'e5b17c3a0f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the keyset-paginated job listing; user_id lookups use its prefix,
+    # so the single-column index becomes redundant
+    op.create_index(
+        "ix_conversion_jobs_user_id_created_at_id",
+        "conversion_jobs",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_conversion_jobs_user_id",
+        table_name="conversion_jobs",
+    )
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_conversion_jobs_user_id",
+        "conversion_jobs",
+        ["user_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_conversion_jobs_user_id_created_at_id",
+        table_name="conversion_jobs",
+    )
@@ -0,0 +1,28 @@
+"""add retry count to conversion jobs
+
+Revision ID: f7a2c9e4b8d1
+Revises: e9c6a3f1d5b2
+Create Date: 2026-03-04 16:28:03.117642
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a2c9e4b8d1'
+down_revision: Union[str, Sequence[str], None] = 'e9c6a3f1d5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "conversion_jobs",
+        sa.Column("retry_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "retry_count")
@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+# Settings are read at import time, so the environment is set up before
+# anything from app is imported
+_workdir = tempfile.mkdtemp(prefix="video-to-mp3-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/test.db")
+os.environ.setdefault("RABBITMQ_URL", "memory://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("STORAGE_LOCAL_ROOT", os.path.join(_workdir, "objects"))
+os.environ.setdefault("CONVERSION_INPUT_CACHE_DIR", os.path.join(_workdir, "inputs"))
+
+import pytest
+from sqlmodel import SQLModel, Session
+from app.database.db import engine
+from app.database.models.conversion_jobs import ConversionJob  # noqa: F401
+from app.database.models.conversion_outputs import ConversionOutput  # noqa: F401
+from app.database.models.outbox import OutboxMessage  # noqa: F401
+from app.database.models.user import User  # noqa: F401
+
+
+@pytest.fixture
+def db():
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
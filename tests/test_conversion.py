@@ -0,0 +1,131 @@
+import io
+import subprocess
+import threading
+from datetime import datetime, timedelta, timezone
+from prometheus_client import REGISTRY
+from sqlmodel import select
+from app.database.models.conversion_jobs import ConversionJob, JobStatus, EncodeMode
+from app.database.models.conversion_outputs import ConversionOutput
+from app.domain.exceptions import ConversionFailedException
+from app.services import conversion
+from app.services.conversion import ConversionService
+from app.services.progress import ProgressReporter
+from app.services.storage import build_storage_service
+
+
+def make_job(db, **fields) -> ConversionJob:
+    job = ConversionJob(user_id=1, input_key="videos/1/input.mp4", status=JobStatus.PENDING, **fields)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def test_process_records_queue_wait(db, monkeypatch):
+    queued_at = datetime.now(timezone.utc) - timedelta(seconds=5)
+    job = make_job(db, queue="convert.standard", queued_at=queued_at)
+    service = ConversionService(db, storage=build_storage_service())
+    monkeypatch.setattr(service, "_convert", lambda job: f"audio/1/{job.id}.mp3")
+    labels = {"queue": "convert.standard"}
+    count = REGISTRY.get_sample_value("conversion_queue_wait_seconds_count", labels) or 0
+    total = REGISTRY.get_sample_value("conversion_queue_wait_seconds_sum", labels) or 0
+
+    service.process(job.id)
+
+    db.refresh(job)
+    assert job.status == JobStatus.DONE
+    assert job.output_key == f"audio/1/{job.id}.mp3"
+    assert job.started_at is not None
+    assert REGISTRY.get_sample_value("conversion_queue_wait_seconds_count", labels) == count + 1
+    wait = REGISTRY.get_sample_value("conversion_queue_wait_seconds_sum", labels) - total
+    assert 5 <= wait < 60
+
+
+def test_renditions_are_not_registered_as_dedup_output(db, monkeypatch):
+    profiles = [{"name": "voice", "codec": "opus", "bitrate": 48}]
+    job = make_job(db, input_hash="abc", renditions=profiles)
+    service = ConversionService(db, storage=build_storage_service())
+    monkeypatch.setattr(service, "_convert", lambda job: f"audio/1/{job.id}/voice.ogg")
+
+    service.process(job.id)
+
+    db.refresh(job)
+    assert job.status == JobStatus.DONE
+    assert job.output_id is None
+    assert db.exec(select(ConversionOutput)).first() is None
+
+
+def test_renditions_fall_back_to_temp_file(db, monkeypatch):
+    storage = build_storage_service()
+    profiles = [{"name": "voice", "codec": "opus", "bitrate": 48}]
+    job = make_job(db, renditions=profiles)
+    service = ConversionService(db, storage=storage)
+    monkeypatch.setattr(service, "_can_stream", lambda job: True)
+    monkeypatch.setattr(service, "_input_path", lambda job: "/tmp/input.mp4")
+
+    def broken_stream(*args):
+        raise ConversionFailedException("moov atom not found")
+
+    def fake_ffmpeg(args, on_progress=None):
+        assert args[args.index("-i") + 1] == "/tmp/input.mp4"
+        with open(args[-1], "wb") as f:
+            f.write(b"audio")
+
+    monkeypatch.setattr(service, "_run_ffmpeg_from_storage", broken_stream)
+    monkeypatch.setattr(conversion, "run_ffmpeg", fake_ffmpeg)
+    reporter = ProgressReporter(job.id, db.get_bind(), None)
+
+    key = service._convert_renditions(job, reporter)
+
+    assert storage.local_path(key)
+
+
+class EndlessProcess:
+    """
+    Stands in for ffmpeg: writes to stdout until killed
+    """
+    def __init__(self, args, on_progress=None, stdin=None, stdout=None):
+        self.process = subprocess.Popen(["yes"], stdin=stdin, stdout=stdout)
+
+    @property
+    def stdin(self):
+        return self.process.stdin
+
+    @property
+    def stdout(self):
+        return self.process.stdout
+
+    def kill(self):
+        self.process.kill()
+
+    def wait(self):
+        return self.process.wait()
+
+
+def test_streaming_kills_ffmpeg_when_upload_fails(db, monkeypatch):
+    storage = build_storage_service()
+    storage.upload_file("videos/1/input.mkv", io.BytesIO(b"x" * 1024), "video/x-matroska")
+    job = make_job(db)
+    service = ConversionService(db, storage=storage)
+
+    def failing_upload(object_name, file, content_type, length=None):
+        file.read(16)
+        raise RuntimeError("connection pool closed")
+
+    monkeypatch.setattr(conversion, "FfmpegProcess", EndlessProcess)
+    monkeypatch.setattr(storage, "upload_file", failing_upload)
+    reporter = ProgressReporter(job.id, db.get_bind(), None)
+    errors = []
+
+    def convert():
+        try:
+            service._convert_streaming("videos/1/input.mkv", "audio/1/out.mp3", EncodeMode.ENCODE, reporter)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=convert, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert errors
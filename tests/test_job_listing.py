@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database.db import async_engine
+from app.database.models.conversion_jobs import ConversionJob, JobStatus
+from app.domain.exceptions import InvalidCursorException
+from app.services.media import AsyncMediaService, decode_job_cursor, encode_job_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    job_id = uuid4()
+
+    assert decode_job_cursor(encode_job_cursor(created_at, job_id)) == (created_at, job_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bm8tc2VwYXJhdG9y", "MjAyNHxub3QtYS11dWlk"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_job_cursor(cursor)
+
+
+def list_all_pages(user_id: int, limit: int, **filters) -> list[list[UUID]]:
+    async def run():
+        pages, cursor = [], None
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                service = AsyncMediaService(db=session, storage=None)
+                while True:
+                    items, cursor = await service.list_jobs(
+                        user_id, limit, cursor=cursor, fields=["id"], **filters
+                    )
+                    pages.append([item["id"] for item in items])
+                    if cursor is None:
+                        return pages
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_pages_are_newest_first_without_gaps_or_repeats(db):
+    started = datetime(2024, 1, 1)
+    jobs = [
+        # Pairs of jobs share a created_at, the id breaks the tie
+        ConversionJob(user_id=1, input_key=f"videos/1/{i}.mp4", created_at=started + timedelta(seconds=i // 2))
+        for i in range(7)
+    ]
+    db.add_all([*jobs, ConversionJob(user_id=2, input_key="videos/2/other.mp4", created_at=started)])
+    db.commit()
+    expected = [job.id for job in sorted(jobs, key=lambda job: (job.created_at, job.id), reverse=True)]
+
+    pages = list_all_pages(user_id=1, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [job_id for page in pages for job_id in page] == expected
+
+
+def test_pages_filtered_by_status(db):
+    done = ConversionJob(user_id=1, input_key="videos/1/a.mp4", status=JobStatus.DONE)
+    db.add_all([done, ConversionJob(user_id=1, input_key="videos/1/b.mp4", status=JobStatus.FAILED)])
+    db.commit()
+
+    assert list_all_pages(user_id=1, limit=10, status=JobStatus.DONE) == [[done.id]]
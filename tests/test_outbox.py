@@ -0,0 +1,49 @@
+import pytest
+from sqlmodel import select
+from app.database.models.outbox import OutboxMessage
+from app.services.outbox import OutboxRelay, enqueue_task
+from app.services.queue.fake import FakeQueue
+
+
+class BrokenQueue(FakeQueue):
+    def publish(self, message: dict) -> None:
+        raise ConnectionError("broker unreachable")
+
+
+def enqueue(db, count: int) -> list[OutboxMessage]:
+    messages = [enqueue_task(db, "convert_video", [f"job-{i}"], "convert.standard") for i in range(count)]
+    db.commit()
+    return messages
+
+
+def test_relay_publishes_unsent_messages_in_order(db):
+    enqueue(db, 3)
+    queue = FakeQueue()
+    relay = OutboxRelay(queue, bind=db.get_bind(), batch_size=2)
+
+    assert relay.relay_batch() == 2
+    assert relay.relay_batch() == 1
+    assert relay.relay_batch() == 0
+
+    published = [queue.consume() for _ in range(3)]
+    assert [message["args"] for message in published] == [["job-0"], ["job-1"], ["job-2"]]
+    assert all(message["task"] == "convert_video" and message["queue"] == "convert.standard" for message in published)
+    assert queue._queue.empty()
+
+    db.expire_all()
+    assert all(message.sent_at is not None for message in db.exec(select(OutboxMessage)))
+
+
+def test_relay_leaves_messages_unsent_when_publishing_fails(db):
+    enqueue(db, 2)
+    relay = OutboxRelay(BrokenQueue(), bind=db.get_bind())
+
+    with pytest.raises(ConnectionError):
+        relay.relay_batch()
+
+    db.expire_all()
+    assert all(message.sent_at is None for message in db.exec(select(OutboxMessage)))
+
+    # The next relay round picks them up again
+    queue = FakeQueue()
+    assert OutboxRelay(queue, bind=db.get_bind()).relay_batch() == 2
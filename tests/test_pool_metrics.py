@@ -0,0 +1,35 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from app.database.pool import InstrumentedQueuePool
+from app.workers.metrics import WorkerPoolMetrics
+
+
+def sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0
+
+
+def test_worker_pool_metrics_follow_checkouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    engine.pool.metrics = WorkerPoolMetrics()
+    # Survives the reset done in every prefork child
+    engine.dispose(close=False)
+    checkouts = sample("worker_db_pool_checkouts_total")
+    overflow_checkouts = sample("worker_db_pool_overflow_checkouts_total")
+
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        assert sample("worker_db_pool_checked_out") == 2
+        assert sample("worker_db_pool_overflow") == 1
+
+    assert sample("worker_db_pool_checked_out") == 0
+    assert sample("worker_db_pool_overflow") == 0
+    assert sample("worker_db_pool_idle") == 1
+    assert sample("worker_db_pool_checkouts_total") == checkouts + 2
+    assert sample("worker_db_pool_overflow_checkouts_total") == overflow_checkouts + 1
+    engine.dispose()
@@ -0,0 +1,25 @@
+import pytest
+from app.workers.queues import LONG_QUEUE, SHORT_QUEUE, STANDARD_QUEUE, conversion_queue_for
+
+MB = 1024 * 1024
+
+
+@pytest.mark.parametrize(
+    "size, duration, queue",
+    [
+        (10 * MB, None, SHORT_QUEUE),
+        (10 * MB, 60, SHORT_QUEUE),
+        (50 * MB, 5 * 60, SHORT_QUEUE),
+        # Small but long: a low-bitrate recording still takes long to encode
+        (10 * MB, 10 * 60, STANDARD_QUEUE),
+        (200 * MB, None, STANDARD_QUEUE),
+        (200 * MB, 30 * 60, STANDARD_QUEUE),
+        (1024 * MB, None, LONG_QUEUE),
+        (10 * MB, 60 * 60, LONG_QUEUE),
+        (None, 2 * 60 * 60, LONG_QUEUE),
+        (None, None, STANDARD_QUEUE),
+        (None, 60, STANDARD_QUEUE),
+    ],
+)
+def test_conversion_queue_for(size, duration, queue):
+    assert conversion_queue_for(size, duration) == queue
@@ -0,0 +1,43 @@
+import pytest
+from app.api.routers.media import parse_range
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("", None),
+        ("items=0-10", None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=999-999", (999, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        (" bytes=0-1", None),
+        ("bytes= 10-20 ", (10, 20)),
+        # Malformed or unsupported: the whole file is sent
+        ("bytes=500-100", None),
+        ("bytes=0-1,5-6", None),
+        ("bytes=abc-", None),
+        ("bytes=-", None),
+        ("bytes=10", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header, size",
+    [
+        ("bytes=1000-", 1000),
+        ("bytes=1000-2000", 1000),
+        ("bytes=-0", 1000),
+        ("bytes=0-", 0),
+        ("bytes=-10", 0),
+    ],
+)
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
@@ -0,0 +1,82 @@
+import io
+from datetime import datetime, timedelta, timezone
+from sqlmodel import select
+from app.core.config import settings
+from app.database.models.conversion_jobs import ConversionJob, JobStatus
+from app.database.models.outbox import OutboxMessage
+from app.services.reaper import JobReaper
+from app.services.storage import build_storage_service
+from app.workers.queues import CONVERT_VIDEO_TASK
+
+
+def make_job(db, **fields) -> ConversionJob:
+    fields.setdefault("input_key", "videos/1/input.mp4")
+    job = ConversionJob(user_id=1, **fields)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def outbox_job_ids(db) -> list[str]:
+    return [message.args[0] for message in db.exec(select(OutboxMessage).order_by(OutboxMessage.id))]
+
+
+def test_reaper_requeues_jobs_with_expired_leases(db):
+    now = datetime.now(timezone.utc)
+    expired = make_job(
+        db,
+        status=JobStatus.PROCESSING,
+        worker_id="dead-worker",
+        lease_expires_at=now - timedelta(seconds=1),
+        queue="convert.long",
+    )
+    alive = make_job(
+        db,
+        status=JobStatus.PROCESSING,
+        worker_id="live-worker",
+        lease_expires_at=now + timedelta(minutes=5),
+    )
+
+    assert JobReaper(db).reap() == 1
+
+    db.refresh(expired)
+    db.refresh(alive)
+    assert (expired.status, expired.worker_id, expired.lease_expires_at) == (JobStatus.PENDING, None, None)
+    assert (alive.status, alive.worker_id) == (JobStatus.PROCESSING, "live-worker")
+
+    message = db.exec(select(OutboxMessage)).one()
+    assert (message.task, message.args, message.queue) == (CONVERT_VIDEO_TASK, [str(expired.id)], "convert.long")
+
+
+def test_reaper_requeues_stale_pending_jobs_once(db):
+    stale = make_job(db, status=JobStatus.PENDING, updated_at=datetime(2024, 1, 1))
+    make_job(db, status=JobStatus.PENDING)
+
+    assert JobReaper(db).reap() == 1
+    # Re-enqueueing bumped updated_at, the next run leaves the job alone
+    assert JobReaper(db).reap() == 0
+
+    assert outbox_job_ids(db) == [str(stale.id)]
+
+
+def test_reaper_fails_abandoned_uploads_and_deletes_their_input(db):
+    storage = build_storage_service()
+    expired_url = datetime.now(timezone.utc) - timedelta(
+        minutes=settings.STORAGE_PRESIGNED_UPLOAD_EXPIRE_MINUTES,
+        seconds=settings.REAPER_UPLOADING_GRACE_SECONDS + 60,
+    )
+    abandoned = make_job(db, status=JobStatus.UPLOADING, created_at=expired_url)
+    storage.upload_file(abandoned.input_key, io.BytesIO(b"partial"), "video/mp4")
+    uploading = make_job(db, status=JobStatus.UPLOADING, input_key="videos/1/recent.mp4")
+    storage.upload_file(uploading.input_key, io.BytesIO(b"partial"), "video/mp4")
+
+    assert JobReaper(db, storage=storage).reap() == 1
+
+    db.refresh(abandoned)
+    db.refresh(uploading)
+    assert (abandoned.status, abandoned.error) == (JobStatus.FAILED, "upload_abandoned")
+    assert storage.local_path(abandoned.input_key) is None
+    assert uploading.status == JobStatus.UPLOADING
+    assert storage.local_path(uploading.input_key) is not None
+    assert outbox_job_ids(db) == []
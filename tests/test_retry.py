@@ -0,0 +1,42 @@
+import errno
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.core.config import settings
+from app.domain.errors import ConversionError
+from app.domain.exceptions import (
+    ConversionFailedException,
+    FfmpegKilledException,
+    ObjectNotFoundError,
+    StoragePermissionError,
+    StorageUnavailableError,
+)
+from app.services.retry import classify_failure, retry_delay
+
+
+@pytest.mark.parametrize(
+    "exc, error, transient",
+    [
+        (StorageUnavailableError("connection refused"), ConversionError.STORAGE_UNAVAILABLE, True),
+        (ObjectNotFoundError("gone"), ConversionError.STORAGE_ERROR, False),
+        (StoragePermissionError("denied"), ConversionError.STORAGE_ERROR, False),
+        (FfmpegKilledException("signal 9"), ConversionError.RESOURCE_EXHAUSTED, True),
+        (MemoryError(), ConversionError.RESOURCE_EXHAUSTED, True),
+        (OSError(errno.ENOMEM, "Cannot allocate memory"), ConversionError.RESOURCE_EXHAUSTED, True),
+        (ConversionFailedException("Invalid data found"), ConversionError.FFMPEG_FAILED, False),
+        (OperationalError("SELECT 1", {}, Exception("server closed the connection")), ConversionError.DATABASE_ERROR, True),
+        (IntegrityError("INSERT", {}, Exception("duplicate key")), ConversionError.UNKNOWN_ERROR, False),
+        (OSError(errno.ENOENT, "No such file"), ConversionError.UNKNOWN_ERROR, False),
+        (ValueError("bug"), ConversionError.UNKNOWN_ERROR, False),
+    ],
+)
+def test_classify_failure(exc, error, transient):
+    assert classify_failure(exc) == (error, transient)
+
+
+def test_retry_delay_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSION_RETRY_BACKOFF_SECONDS", 10)
+    monkeypatch.setattr(settings, "CONVERSION_RETRY_BACKOFF_MAX_SECONDS", 60)
+
+    for retry, cap in [(1, 10), (2, 20), (3, 40), (4, 60), (10, 60)]:
+        delays = [retry_delay(retry) for _ in range(50)]
+        assert all(cap / 2 <= delay <= cap for delay in delays)
@@ -0,0 +1,68 @@
+import array
+import os
+import shutil
+import subprocess
+import pytest
+from app.core.config import settings
+from app.services.conversion import ConversionService
+from app.services.mp3 import crc16, crc16_combine, frame_samples
+from app.services.probe import probe_media
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+SAMPLE_RATE = 44100
+# lavfi's sine source plays at 1/8 of full scale
+SINE_AMPLITUDE = 32768 // 8
+
+
+def decode(path: str) -> array.array:
+    pcm = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    samples = array.array("h")
+    samples.frombytes(pcm)
+    return samples
+
+
+def test_crc16_combine():
+    first, second = os.urandom(1000), os.urandom(777)
+
+    assert crc16_combine(crc16(first), crc16(second), len(second)) == crc16(first + second)
+    assert crc16_combine(crc16(b""), crc16(second), len(second)) == crc16(second)
+
+
+@needs_ffmpeg
+def test_segmented_encode_is_gapless(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSION_SEGMENT_COUNT", 4)
+    input_path = str(tmp_path / "input.wav")
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error",
+            "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate={SAMPLE_RATE}:duration=20",
+            input_path,
+        ],
+        check=True,
+    )
+    media_info = probe_media(input_path)
+    service = ConversionService.__new__(ConversionService)
+
+    service._run_ffmpeg(input_path, str(tmp_path / "single.mp3"))
+    service._run_ffmpeg_segmented(input_path, str(tmp_path / "segmented.mp3"), media_info, str(tmp_path))
+    single = decode(str(tmp_path / "single.mp3"))
+    segmented = decode(str(tmp_path / "segmented.mp3"))
+
+    samples_per_frame = frame_samples(SAMPLE_RATE)
+    assert abs(len(segmented) - len(single)) <= samples_per_frame
+
+    # Joins sit within a few frames of the nominal boundaries. A click or a
+    # join that is off by even a sample shows up as an error in the thousands,
+    # the encodes themselves differ by a handful
+    total_frames = -(-len(single) // samples_per_frame)
+    frames_per_segment = -(-total_frames // settings.CONVERSION_SEGMENT_COUNT)
+    for boundary in range(frames_per_segment, total_frames, frames_per_segment):
+        center = boundary * samples_per_frame
+        window = range(center - 5 * samples_per_frame, center + 5 * samples_per_frame)
+        error = max(abs(segmented[index] - single[index]) for index in window)
+        assert error < SINE_AMPLITUDE // 50
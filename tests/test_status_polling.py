@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.database.db import async_engine
+from app.database.models.conversion_jobs import ConversionJob, JobStatus
+from app.services.lease import LeaseHeartbeat
+from app.services.media import AsyncMediaService
+from app.services.progress import ProgressReporter
+
+
+def make_processing_job(db) -> ConversionJob:
+    job = ConversionJob(
+        user_id=1,
+        input_key="videos/1/input.mp4",
+        status=JobStatus.PROCESSING,
+        worker_id="worker-1",
+        updated_at=datetime(2024, 1, 1),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def test_lease_renewal_keeps_updated_at(db):
+    job = make_processing_job(db)
+
+    LeaseHeartbeat(job.id, db.get_bind(), owner="worker-1").renew()
+
+    db.refresh(job)
+    assert job.lease_expires_at is not None
+    assert job.updated_at == datetime(2024, 1, 1)
+
+
+def test_progress_keeps_updated_at(db):
+    job = make_processing_job(db)
+
+    ProgressReporter(job.id, db.get_bind(), 100.0)._save(50.0, 2.0, 25)
+
+    db.refresh(job)
+    assert job.progress == 50.0
+    assert job.updated_at == datetime(2024, 1, 1)
+
+
+def get_statuses(job_ids, user_id, since=None):
+    async def run():
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                return await AsyncMediaService(db=session, storage=None).get_statuses(job_ids, user_id, since)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_statuses_of_own_jobs_changed_since(db):
+    old = ConversionJob(user_id=1, input_key="videos/1/a.mp4", updated_at=datetime(2024, 1, 1))
+    recent = ConversionJob(user_id=1, input_key="videos/1/b.mp4")
+    other = ConversionJob(user_id=2, input_key="videos/2/c.mp4")
+    db.add_all([old, recent, other])
+    db.commit()
+
+    jobs, as_of = get_statuses([old.id, recent.id, other.id, uuid4()], user_id=1)
+    assert {job.id for job in jobs} == {old.id, recent.id}
+
+    jobs, _ = get_statuses([old.id, recent.id], user_id=1, since=datetime(2024, 6, 1, tzinfo=timezone.utc))
+    assert [job.id for job in jobs] == [recent.id]
+
+    # as_of trails the DB clock, so the next poll overlaps this one
+    assert as_of.tzinfo is not None
+    assert as_of <= datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_STATUS_POLL_OVERLAP_SECONDS) + timedelta(seconds=1)
+    jobs, _ = get_statuses([recent.id], user_id=1, since=as_of)
+    assert [job.id for job in jobs] == [recent.id]
@@ -0,0 +1,86 @@
+import errno
+import os
+import pytest
+from prometheus_client import REGISTRY
+from urllib3.exceptions import ProtocolError
+from app.domain.errors import ConversionError
+from app.domain.exceptions import StorageUnavailableError
+from app.services import local_storage
+from app.services.conversion import ConversionService
+from app.services.local_storage import LocalStorageService
+from app.services.retry import classify_failure
+from app.services.storage import MinioStorageService
+
+
+class DroppingResponse:
+    """
+    Response whose connection is reset after the first chunk of the body
+    """
+    headers = {"Content-Length": "2048"}
+
+    def read(self, size=None):
+        raise ProtocolError("Connection broken", ConnectionResetError(104, "Connection reset by peer"))
+
+    def stream(self, chunk_size):
+        yield b"x" * 1024
+        self.read()
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        return DroppingResponse()
+
+
+@pytest.fixture
+def storage():
+    storage = MinioStorageService.__new__(MinioStorageService)
+    storage.client = FakeMinio()
+    storage.bucket = "test"
+    return storage
+
+
+def test_connection_drop_mid_stream_is_transient(db, storage, tmp_path):
+    service = ConversionService(db, storage=storage)
+
+    with pytest.raises(StorageUnavailableError) as exc_info:
+        service._download_to_file("videos/1/input.mp4", str(tmp_path / "input.mp4"))
+
+    assert classify_failure(exc_info.value) == (ConversionError.STORAGE_UNAVAILABLE, True)
+
+
+def test_connection_drop_while_reading_range(db, storage):
+    service = ConversionService(db, storage=storage)
+
+    with pytest.raises(StorageUnavailableError):
+        service._read_range("videos/1/input.mp4", 0, 16)
+
+
+def test_local_upload_path_across_filesystems_is_one_upload(tmp_path, monkeypatch):
+    storage = LocalStorageService(str(tmp_path / "objects"))
+    source = tmp_path / "output.mp3"
+    source.write_bytes(b"x" * 4096)
+    replace = os.replace
+
+    def cross_device_replace(src, dst):
+        # Only the temporary file written next to the object can be renamed
+        if not os.path.realpath(src).startswith(storage.root):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        replace(src, dst)
+
+    monkeypatch.setattr(local_storage.os, "replace", cross_device_replace)
+    labels = {"operation": "upload"}
+    uploads = REGISTRY.get_sample_value("storage_operation_duration_seconds_count", labels) or 0
+    uploaded = REGISTRY.get_sample_value("storage_bytes_total", labels) or 0
+
+    storage.upload_path("audio/1/out.mp3", str(source), "audio/mpeg")
+
+    with open(storage.local_path("audio/1/out.mp3"), "rb") as f:
+        assert f.read() == b"x" * 4096
+    assert REGISTRY.get_sample_value("storage_operation_duration_seconds_count", labels) == uploads + 1
+    assert REGISTRY.get_sample_value("storage_bytes_total", labels) == uploaded + 4096
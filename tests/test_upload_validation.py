@@ -0,0 +1,116 @@
+import io
+import shutil
+import pytest
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.database.db import engine
+from app.database.models.conversion_jobs import ConversionJob, JobStatus
+from app.database.models.outbox import OutboxMessage
+from app.domain.exceptions import ConversionFailedException, InvalidMediaException, ProbeUnavailableException
+from app.services import media
+from app.services.media import MediaService
+from app.services.probe import probe_media
+from app.services.storage import build_storage_service
+
+needs_ffprobe = pytest.mark.skipif(shutil.which("ffprobe") is None, reason="needs ffprobe")
+
+
+@pytest.fixture
+def storage():
+    return build_storage_service()
+
+
+def make_uploaded_job(db, storage) -> ConversionJob:
+    job = ConversionJob(user_id=1, input_key="", status=JobStatus.UPLOADING)
+    job.input_key = f"videos/1/{job.id}/input.mp4"
+    storage.upload_file(job.input_key, io.BytesIO(b"not really a video"), "video/mp4")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [
+        ProbeUnavailableException("Could not run ffprobe: No such file or directory"),
+        ProbeUnavailableException("ffprobe timed out"),
+    ],
+)
+def test_unprobed_inputs_are_queued(db, storage, monkeypatch, failure):
+    job = make_uploaded_job(db, storage)
+
+    def probe(source):
+        raise failure
+
+    monkeypatch.setattr(media, "probe_media", probe)
+
+    MediaService(storage=storage, db=db).complete_upload(job.id, user_id=1)
+
+    db.refresh(job)
+    assert job.status == JobStatus.PENDING
+    assert job.media_info is None
+    assert storage.local_path(job.input_key) is not None
+
+
+def test_rejected_inputs_are_failed_and_deleted(db, storage, monkeypatch):
+    job = make_uploaded_job(db, storage)
+
+    def probe(source):
+        raise ConversionFailedException("ffprobe failed: Invalid data found when processing input")
+
+    monkeypatch.setattr(media, "probe_media", probe)
+
+    with pytest.raises(InvalidMediaException):
+        MediaService(storage=storage, db=db).complete_upload(job.id, user_id=1)
+
+    db.refresh(job)
+    assert (job.status, job.error) == (JobStatus.FAILED, "unsupported_format")
+    assert storage.local_path(job.input_key) is None
+
+
+def test_probe_without_ffprobe_installed(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+    with pytest.raises(ProbeUnavailableException):
+        probe_media(str(tmp_path / "input.mp4"))
+
+
+@needs_ffprobe
+def test_probe_rejects_garbage(tmp_path):
+    path = tmp_path / "input.mp4"
+    path.write_bytes(b"\x00\x01garbage" * 500)
+
+    with pytest.raises(ConversionFailedException):
+        probe_media(str(path))
+
+
+@needs_ffprobe
+def test_probe_of_unreachable_url_is_unavailable():
+    # Nothing listens on the discard port
+    with pytest.raises(ProbeUnavailableException):
+        probe_media("http://127.0.0.1:9/input.mp4")
+
+
+def test_concurrent_completes_queue_the_job_once(db, storage, monkeypatch):
+    job = make_uploaded_job(db, storage)
+    monkeypatch.setattr(settings, "UPLOAD_PROBE_ENABLED", False)
+    stat_file = storage.stat_file
+    calls = []
+
+    def racing_stat_file(object_name):
+        # The first call is overtaken by a second one between its read of
+        # the job and its update
+        calls.append(object_name)
+        if len(calls) == 1:
+            with Session(engine) as other:
+                MediaService(storage=storage, db=other).complete_upload(job.id, user_id=1)
+        return stat_file(object_name)
+
+    monkeypatch.setattr(storage, "stat_file", racing_stat_file)
+
+    completed = MediaService(storage=storage, db=db).complete_upload(job.id, user_id=1)
+
+    assert len(calls) == 2
+    assert completed.status == JobStatus.PENDING
+    assert len(db.exec(select(OutboxMessage)).all()) == 1
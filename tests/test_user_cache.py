@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from datetime import datetime
+from app.database.models.user import User
+from app.services.cache.memory import MemoryCache
+from app.services.user_cache import UserCache
+
+
+class RecordingCache(MemoryCache):
+    """
+    Memory cache posing as a network backend, remembers which threads called it
+    """
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value, ttl):
+        self.threads.add(threading.get_ident())
+        super().set(key, value, ttl)
+
+    def delete(self, key):
+        self.threads.add(threading.get_ident())
+        super().delete(key)
+
+
+def test_blocking_backend_runs_off_the_event_loop():
+    backend = RecordingCache()
+    cache = UserCache(backend, ttl=60)
+    user = User(id=1, username="alice", created_at=datetime(2024, 1, 1))
+
+    async def load(username):
+        return user
+
+    async def run():
+        assert (await cache.aget_user("alice", load)).id == 1
+        assert (await cache.aget_user("alice", load)).id == 1
+        await cache.ainvalidate("alice")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert backend.threads
+    assert loop_thread not in backend.threads
+    assert cache.stats() == {"hits": 1, "misses": 1}